@@ -1,7 +1,36 @@
+import asyncio
+import base64
+import csv
+import io
+import json
+import os
 from fastapi import FastAPI, HTTPException
 from typing import Optional, List
-from pydantic import BaseModel
-from datetime import date
+from pydantic import BaseModel, Field
+from datetime import date, datetime
+import db
+from cache import DistinctValueIndex, TTLCache
+from columnar import TransactionColumns, group_summary, summarize, time_series
+from snapshot import fresh_snapshot
+
+async def load_distinct_values(supabase, table: str, column: str):
+    snapshot = fresh_snapshot(table)
+    if snapshot:
+        rows = await snapshot.query(f'SELECT DISTINCT "{column}" FROM "{table}"')
+    else:
+        rows = (await db.execute(supabase.table(table).select(column))).data
+    return [row[column] for row in rows]
+
+# Distinct values for the filter dropdowns, shared by both endpoints below
+unique_values_index = DistinctValueIndex(
+    'transactions',
+    ['city', 'product', 'sales_rep', 'sku'],
+    ttl=float(os.getenv("UNIQUE_VALUES_TTL", "300")),
+    loader=load_distinct_values,
+)
+
+# Max independent reads one request fans out concurrently (1 = sequential)
+QUERY_FANOUT_LIMIT = int(os.getenv("QUERY_FANOUT_LIMIT", "4"))
 
 class TransactionFilter(BaseModel):
     start_date: Optional[date] = None
@@ -9,27 +38,18 @@ class TransactionFilter(BaseModel):
     city: Optional[str] = None
     product: Optional[str] = None
     sales_rep: Optional[str] = None
+    # aggregate=True computes the summary in the database (get_transaction_summary RPC)
+    # and only returns rows when a limit is given, paged with offset
+    aggregate: bool = False
+    limit: Optional[int] = Field(None, ge=1, le=1000)
+    offset: int = Field(0, ge=0)
 
 class TransactionResponse(BaseModel):
     transactions: List[dict]
     summary: dict
     unique_values: dict
 
-async def get_filtered_transactions(supabase, filters: TransactionFilter):
-    # Get unique values for each column
-    unique_cities = supabase.table('transactions').select('city').execute()
-    unique_products = supabase.table('transactions').select('product').execute()
-    unique_sales_reps = supabase.table('transactions').select('sales_rep').execute()
-    
-    unique_values = {
-        'cities': sorted(list(set(row['city'] for row in unique_cities.data))),
-        'products': sorted(list(set(row['product'] for row in unique_products.data))),
-        'sales_reps': sorted(list(set(row['sales_rep'] for row in unique_sales_reps.data)))
-    }
-
-    # Build the query for filtered transactions
-    query = supabase.table('transactions').select('*')
-    
+def apply_transaction_filters(query, filters: TransactionFilter):
     if filters.start_date:
         query = query.gte('date', filters.start_date.isoformat())
     if filters.end_date:
@@ -40,10 +60,106 @@ async def get_filtered_transactions(supabase, filters: TransactionFilter):
         query = query.eq('product', filters.product)
     if filters.sales_rep:
         query = query.eq('sales_rep', filters.sales_rep)
-    
+    return query
+
+def local_transaction_where(filters: Optional[TransactionFilter]):
+    """SQL WHERE clause and params for the local snapshot, mirroring apply_transaction_filters."""
+    clauses, params = [], []
+    if filters:
+        for column, op, value in (
+            ('date', '>=', filters.start_date.isoformat() if filters.start_date else None),
+            ('date', '<=', filters.end_date.isoformat() if filters.end_date else None),
+            ('city', '=', filters.city),
+            ('product', '=', filters.product),
+            ('sales_rep', '=', filters.sales_rep),
+        ):
+            if value:
+                clauses.append(f'"{column}" {op} ?')
+                params.append(value)
+    return (' WHERE ' + ' AND '.join(clauses) if clauses else ''), params
+
+async def get_transaction_summary(supabase, filters: TransactionFilter):
+    """Compute the filtered summary in Postgres (see sql/get_transaction_summary.sql)."""
+    snapshot = fresh_snapshot('transactions')
+    if snapshot:
+        where, params = local_transaction_where(filters)
+        rows = await snapshot.query(
+            'SELECT SUM(total) AS total_sales, AVG(price) AS avg_price, SUM(quantity) AS total_quantity, '
+            f'COUNT(*) AS transaction_count FROM transactions{where}', params
+        )
+    else:
+        response = await db.execute(supabase.rpc('get_transaction_summary', {
+            'p_start_date': filters.start_date.isoformat() if filters.start_date else None,
+            'p_end_date': filters.end_date.isoformat() if filters.end_date else None,
+            # Empty strings mean "no filter", as in apply_transaction_filters
+            'p_city': filters.city or None,
+            'p_product': filters.product or None,
+            'p_sales_rep': filters.sales_rep or None,
+        }))
+        rows = response.data
+    row = rows[0] if isinstance(rows, list) else rows
+    row = row or {}
+    return {
+        'total_sales': round(float(row.get('total_sales') or 0), 2),
+        'avg_price': round(float(row.get('avg_price') or 0), 2),
+        'total_quantity': row.get('total_quantity') or 0,
+        'transaction_count': row.get('transaction_count') or 0
+    }
+
+async def fetch_filtered_transactions(supabase, filters: TransactionFilter, query):
+    snapshot = fresh_snapshot('transactions')
+    if snapshot:
+        where, params = local_transaction_where(filters)
+        return await snapshot.query(f'SELECT * FROM transactions{where}', params)
+    return (await db.execute(query)).data
+
+async def get_filtered_transactions(supabase, filters: TransactionFilter):
+    query = apply_transaction_filters(supabase.table('transactions').select('*'), filters)
+
+    if filters.aggregate:
+        try:
+            # Summary, optional page and dropdown values are independent reads
+            async def fetch_page():
+                if not filters.limit:
+                    return []
+                snapshot = fresh_snapshot('transactions')
+                if snapshot:
+                    where, params = local_transaction_where(filters)
+                    return await snapshot.query(
+                        f'SELECT * FROM transactions{where} ORDER BY date DESC, id DESC LIMIT ? OFFSET ?',
+                        params + [filters.limit, filters.offset]
+                    )
+                response = await db.execute(
+                    query.order('date', desc=True).order('id', desc=True).range(filters.offset, filters.offset + filters.limit - 1)
+                )
+                return response.data
+
+            summary, transactions, cities, products, sales_reps = await db.gather(
+                get_transaction_summary(supabase, filters),
+                fetch_page(),
+                unique_values_index.values(supabase, 'city'),
+                unique_values_index.values(supabase, 'product'),
+                unique_values_index.values(supabase, 'sales_rep'),
+                limit=QUERY_FANOUT_LIMIT,
+            )
+            return TransactionResponse(
+                transactions=transactions,
+                summary=summary,
+                unique_values={'cities': cities, 'products': products, 'sales_reps': sales_reps}
+            )
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
     try:
-        response = query.execute()
-        transactions = response.data
+        # Get unique values for each column alongside the filtered rows
+        transactions, cities, products, sales_reps = await db.gather(
+            fetch_filtered_transactions(supabase, filters, query),
+            unique_values_index.values(supabase, 'city'),
+            unique_values_index.values(supabase, 'product'),
+            unique_values_index.values(supabase, 'sales_rep'),
+            limit=QUERY_FANOUT_LIMIT,
+        )
+        unique_values = {'cities': cities, 'products': products, 'sales_reps': sales_reps}
         
         # Calculate summary statistics
         if transactions:
@@ -80,17 +196,19 @@ class UniqueValuesResponse(BaseModel):
 
 async def get_unique_values(supabase):
     try:
-        # Get unique values for each column
-        unique_cities = supabase.table('transactions').select('city').execute()
-        unique_products = supabase.table('transactions').select('product').execute()
-        unique_sales_reps = supabase.table('transactions').select('sales_rep').execute()
-        unique_skus = supabase.table('transactions').select('sku').execute()
-        
+        # Get unique values for each column concurrently
+        cities, products, sales_reps, skus = await db.gather(
+            unique_values_index.values(supabase, 'city'),
+            unique_values_index.values(supabase, 'product'),
+            unique_values_index.values(supabase, 'sales_rep'),
+            unique_values_index.values(supabase, 'sku'),
+            limit=QUERY_FANOUT_LIMIT,
+        )
         unique_values = UniqueValuesResponse(
-            cities=sorted(list(set(row['city'] for row in unique_cities.data))),
-            products=sorted(list(set(row['product'] for row in unique_products.data))),
-            sales_reps=sorted(list(set(row['sales_rep'] for row in unique_sales_reps.data))),
-            skus=sorted(list(set(row['sku'] for row in unique_skus.data)))
+            cities=cities,
+            products=products,
+            sales_reps=sales_reps,
+            skus=skus
         )
         
         return unique_values
@@ -101,24 +219,240 @@ async def get_unique_values(supabase):
 class RecentTransactionsResponse(BaseModel):
     transactions: List[dict]
     total_count: int
+    count_strategy: str = 'exact'
 
-async def get_recent_transactions(supabase, limit: int = 20):
+# Exact counts reused by the 'cached' strategy
+transaction_count_cache = TTLCache(ttl=float(os.getenv("TRANSACTION_COUNT_TTL", "60")))
+
+async def count_transactions(supabase, strategy: str = 'cached'):
+    """Count transactions without fetching rows.
+
+    'exact' runs COUNT(*), 'planned' uses the planner's estimate, 'estimated'
+    lets PostgREST pick between them, and 'cached' reuses an exact count for
+    TRANSACTION_COUNT_TTL seconds.
+    """
+    if strategy == 'cached':
+        count = transaction_count_cache.get('transactions')
+        if count is None:
+            count = await count_transactions(supabase, 'exact')
+            transaction_count_cache.set('transactions', count)
+        return count
+    response = await db.execute(
+        supabase.table('transactions').select('id', count=strategy).limit(1)
+    )
+    return response.count or 0
+
+async def get_recent_transactions(supabase, limit: int = 20, count_strategy: str = 'cached'):
     try:
         # Get the latest transactions, ordered by date desc
-        response = supabase.table('transactions')\
+        recent_query = supabase.table('transactions')\
             .select('*')\
             .order('date', desc=True)\
-            .limit(limit)\
-            .execute()
-            
-        # Get total count of all transactions
-        count_response = supabase.table('transactions')\
-            .select('*', count='exact')\
-            .execute()
-            
+            .order('id', desc=True)\
+            .limit(limit)
+
+        # Run the page and the count concurrently rather than back to back
+        response, total_count = await asyncio.gather(
+            db.execute(recent_query),
+            count_transactions(supabase, count_strategy),
+        )
+
         return RecentTransactionsResponse(
             transactions=response.data,
-            total_count=count_response.count
+            total_count=total_count,
+            count_strategy=count_strategy
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+###################################################
+class TransactionPage(BaseModel):
+    transactions: List[dict]
+    next_cursor: Optional[str] = None
+
+def encode_cursor(row: dict) -> str:
+    raw = json.dumps([row['date'], row['id']], default=str)
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(cursor: str):
+    """(date, id) from a cursor, validated since both end up in a PostgREST filter."""
+    try:
+        last_date, last_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(last_date, str) or isinstance(last_id, bool):
+            raise ValueError
+        try:
+            date.fromisoformat(last_date)
+        except ValueError:
+            datetime.fromisoformat(last_date)
+        return last_date, int(last_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def transactions_page_query(supabase, cursor: Optional[str] = None, limit: int = 500,
+                            filters: Optional[TransactionFilter] = None, columns: str = '*'):
+    """Keyset page over transactions ordered by (date, id) descending."""
+    query = supabase.table('transactions').select(columns)
+    if filters:
+        query = apply_transaction_filters(query, filters)
+    if cursor:
+        last_date, last_id = decode_cursor(cursor)
+        query = query.or_(f'date.lt."{last_date}",and(date.eq."{last_date}",id.lt.{last_id})')
+    return query.order('date', desc=True).order('id', desc=True).limit(limit)
+
+async def fetch_transactions_page(supabase, cursor: Optional[str] = None, limit: int = 500,
+                                  filters: Optional[TransactionFilter] = None, columns: str = '*'):
+    """One keyset page, from the local snapshot when it is fresh enough."""
+    snapshot = fresh_snapshot('transactions')
+    if not snapshot:
+        return (await db.execute(transactions_page_query(supabase, cursor, limit, filters, columns))).data
+
+    where, params = local_transaction_where(filters)
+    if cursor:
+        last_date, last_id = decode_cursor(cursor)
+        where += (' AND ' if where else ' WHERE ') + '(date < ? OR (date = ? AND id < ?))'
+        params += [last_date, last_date, last_id]
+    select = '*' if columns == '*' else ', '.join(f'"{c.strip()}"' for c in columns.split(','))
+    return await snapshot.query(
+        f'SELECT {select} FROM transactions{where} ORDER BY date DESC, id DESC LIMIT ?', params + [limit]
+    )
+
+async def get_transactions_page(supabase, cursor: Optional[str] = None, limit: int = 500,
+                                filters: Optional[TransactionFilter] = None):
+    rows = await fetch_transactions_page(supabase, cursor, limit, filters)
+    return TransactionPage(
+        transactions=rows,
+        next_cursor=encode_cursor(rows[-1]) if len(rows) == limit else None
+    )
+
+async def iter_transaction_pages(supabase, filters: Optional[TransactionFilter] = None, page_size: int = 1000,
+                                 columns: str = '*'):
+    """Yield transactions page by page so callers never hold the whole table."""
+    cursor = None
+    while True:
+        rows = await fetch_transactions_page(supabase, cursor, page_size, filters, columns)
+        if rows:
+            yield rows
+        if len(rows) < page_size:
+            return
+        cursor = encode_cursor(rows[-1])
+
+async def export_transactions(supabase, export_format: str = "ndjson",
+                        filters: Optional[TransactionFilter] = None, page_size: int = 1000):
+    """Generator of NDJSON lines or CSV chunks for a StreamingResponse."""
+    if export_format == "ndjson":
+        async for rows in iter_transaction_pages(supabase, filters, page_size):
+            yield "".join(json.dumps(row, default=str) + "\n" for row in rows)
+        return
+
+    fieldnames = None
+    async for rows in iter_transaction_pages(supabase, filters, page_size):
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=fieldnames or list(rows[0].keys()), extrasaction='ignore')
+        if fieldnames is None:
+            fieldnames = writer.fieldnames
+            writer.writeheader()
+        writer.writerows(rows)
+        yield buffer.getvalue()
+
+###################################################
+class TransactionSummaryResponse(BaseModel):
+    summary: dict
+    groups: Optional[List[dict]] = None
+    series: Optional[List[dict]] = None
+
+async def get_transaction_breakdown(supabase, filters: TransactionFilter, group_by: Optional[str] = None,
+                                    bucket: Optional[str] = None):
+    """Summary, per-group totals and a date-bucketed series computed over NumPy columns."""
+    try:
+        columns = 'id,date,total,price,quantity' + (f',{group_by}' if group_by else '')
+        parts, group_keys = [], {}
+        async for rows in iter_transaction_pages(supabase, filters, columns=columns):
+            parts.append(TransactionColumns(rows, group_by, group_keys))
+        cols = TransactionColumns.concat(parts)
+
+        return TransactionSummaryResponse(
+            summary=summarize(cols),
+            groups=group_summary(cols) if group_by else None,
+            series=time_series(cols, bucket) if bucket else None
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Sales forecast
+FORECAST_DATE_COLUMN = os.getenv("FORECAST_DATE_COLUMN", "date")
+forecast_cache = TTLCache(ttl=float(os.getenv("FORECAST_CACHE_TTL", "300")), maxsize=256)
+# Larger results are served but not cached, so 256 entries stay bounded in memory
+FORECAST_CACHE_MAX_ROWS = int(os.getenv("FORECAST_CACHE_MAX_ROWS", "20000"))
+
+class ForecastQuery(BaseModel):
+    fields: Optional[List[str]] = None
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    skus: Optional[List[str]] = None
+    limit: Optional[int] = Field(None, ge=1, le=10000)
+    offset: int = Field(0, ge=0)
+
+    def cache_key(self):
+        """Equivalent queries (field/SKU order, duplicates) share one cache entry."""
+        return (
+            tuple(sorted(set(self.fields))) if self.fields else None,
+            self.start_date,
+            self.end_date,
+            tuple(sorted(set(self.skus))) if self.skus else None,
+            self.limit,
+            self.offset,
+        )
+
+def parse_forecast_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Split `fields=a,b` into column names, rejecting anything that is not a plain identifier."""
+    if not fields:
+        return None
+    names = [name.strip() for name in fields.split(',') if name.strip()]
+    invalid = [name for name in names if not name.isidentifier()]
+    if invalid:
+        raise HTTPException(status_code=400, detail=f"Invalid field names: {', '.join(invalid)}")
+    return names or None
+
+async def query_sales_forecast(supabase, params: ForecastQuery) -> List[dict]:
+    date_column = FORECAST_DATE_COLUMN
+    snapshot = fresh_snapshot('sales_forecast')
+    if snapshot:
+        clauses, values = [], []
+        if params.start_date:
+            clauses.append(f'"{date_column}" >= ?')
+            values.append(params.start_date.isoformat())
+        if params.end_date:
+            clauses.append(f'"{date_column}" <= ?')
+            values.append(params.end_date.isoformat())
+        if params.skus:
+            clauses.append(f'sku IN ({", ".join("?" for _ in params.skus)})')
+            values.extend(params.skus)
+        select = ', '.join(f'"{name}"' for name in params.fields) if params.fields else '*'
+        where = ' WHERE ' + ' AND '.join(clauses) if clauses else ''
+        sql = f'SELECT {select} FROM sales_forecast{where} ORDER BY "{date_column}", id'
+        if params.limit:
+            sql += ' LIMIT ? OFFSET ?'
+            values += [params.limit, params.offset]
+        return await snapshot.query(sql, values)
+
+    query = supabase.table('sales_forecast').select(','.join(params.fields) if params.fields else '*')
+    if params.start_date:
+        query = query.gte(date_column, params.start_date.isoformat())
+    if params.end_date:
+        query = query.lte(date_column, params.end_date.isoformat())
+    if params.skus:
+        query = query.in_('sku', params.skus)
+    query = query.order(date_column).order('id')
+    if params.limit:
+        query = query.range(params.offset, params.offset + params.limit - 1)
+    return (await db.execute(query)).data
+
+async def get_sales_forecast(supabase, params: ForecastQuery) -> List[dict]:
+    """Forecast rows for the query, cached for FORECAST_CACHE_TTL seconds per normalized query."""
+    key = params.cache_key()
+    rows = forecast_cache.get(key)
+    if rows is None:
+        rows = await query_sales_forecast(supabase, params)
+        if len(rows) <= FORECAST_CACHE_MAX_ROWS:
+            forecast_cache.set(key, rows)
+    return rows
@@ -1,17 +1,8 @@
 import streamlit as st
 import os
-from fastapi import FastAPI, HTTPException
 from supabase import create_client, Client
-from typing import Optional
-from fastapi.middleware.cors import CORSMiddleware
-import google.generativeai as genai
 from dotenv import load_dotenv
-import uuid
-from pydantic import BaseModel
-from datetime import datetime
-from API_Database import TransactionFilter, get_filtered_transactions, get_unique_values, get_recent_transactions
 import requests
-from bs4 import BeautifulSoup
 from openai import OpenAI
 
 
@@ -19,8 +10,6 @@ from openai import OpenAI
 # Load environment variables
 load_dotenv()
 
-# Initialize FastAPI app
-app = FastAPI()
 #api_key = os.getenv("OPENAI")
 #openai.api_key = os.getenv("OPENAI")
 
@@ -29,15 +18,36 @@ FASTAPI_URL = "https://tasteapi.onrender.com"
 
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+REPOS_CACHE_TTL = int(os.getenv("ADMIN_REPOS_CACHE_TTL", "120"))
+STYLES_CACHE_TTL = int(os.getenv("ADMIN_STYLES_CACHE_TTL", "300"))
 
 
-# Function to fetch repositories from FastAPI
+# Clients are built once per server process and shared across reruns and sessions
+@st.cache_resource
+def get_supabase() -> Client:
+    return create_client(SUPABASE_URL, SUPABASE_KEY)
+
+@st.cache_resource
+def get_http_session():
+    """Keep-alive session for calls to the FastAPI backend."""
+    return requests.Session()
+
+@st.cache_resource
+def get_openai_client():
+    return OpenAI(api_key=os.getenv("MYKEY"))
+
+
+# Function to fetch repositories from FastAPI; failures raise so they are not cached
+@st.cache_data(ttl=REPOS_CACHE_TTL, show_spinner=False)
 def fetch_repos():
-    response = requests.get(f"{FASTAPI_URL}/list-repos/")
-    if response.status_code == 200:
-        return response.json().get("repositories", [])
-    else:
+    response = get_http_session().get(f"{FASTAPI_URL}/list-repos/")
+    response.raise_for_status()
+    return response.json().get("repositories", [])
+
+def load_repos():
+    try:
+        return fetch_repos()
+    except requests.RequestException:
         st.error("Failed to fetch repositories.")
         return []
 
@@ -48,18 +58,17 @@ def create_repo(repo_name, description, private):
         "description": description,
         "private": private
     }
-    response = requests.post(f"{FASTAPI_URL}/create-repo/", json=repo_data)
+    response = get_http_session().post(f"{FASTAPI_URL}/create-repo/", json=repo_data)
     if response.status_code == 200:
+        fetch_repos.clear()  # Show the new repo on the next render
         st.success("Repository created successfully!")
     else:
         st.error(f"Failed to create repository: {response.json()}")
 
 # Function to fetch trending styles from Supabase
+@st.cache_data(ttl=STYLES_CACHE_TTL, show_spinner=False)
 def fetch_trending_styles():
-    # Replace this with your actual Supabase client setup
-    from supabase import create_client
-    supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
-    response = supabase.table('trending_styles').select('*').execute()
+    response = get_supabase().table('trending_styles').select('*').execute()
     return response.data
 
 # Streamlit App
@@ -73,7 +82,9 @@ with tab1:
     st.header("Manage Repositories")
 
     # Section 1: List Existing Repositories
-    repos = fetch_repos()
+    if st.button("Refresh repositories"):
+        fetch_repos.clear()
+    repos = load_repos()
 
     
     if repos:
@@ -102,6 +113,8 @@ with tab2:
     st.header("Manage Trending Styles")
 
     # Fetch and Display Trending Styles
+    if st.button("Refresh styles"):
+        fetch_trending_styles.clear()
     styles = fetch_trending_styles()
     if styles:
         with st.expander("View Trending Styles", expanded=False):
@@ -134,18 +147,17 @@ with tab3:
     
         # GitHub Repositories
         if st.button("Fetch GitHub Repos"):
-            response = requests.get(f"{FASTAPI_URL}/list-repos")
-            if response.status_code == 200:
-                repos = response.json().get("repositories", [])
+            try:
+                repos = fetch_repos()
                 st.write("Your GitHub Repositories:")
                 st.write(repos)
-            else:
+            except requests.RequestException:
                 st.error("Failed to fetch GitHub repositories")
         
         # Ask OpenAI
         prompt = st.text_input("Ask OpenAI:")
         if st.button("Ask"):
-            response = requests.post(f"{FASTAPI_URL}/ask", json={"prompt": prompt})
+            response = get_http_session().post(f"{FASTAPI_URL}/ask", json={"prompt": prompt})
             if response.status_code == 200:
                 answer = response.json()["response"]
                 st.write("OpenAI Response:")
@@ -158,7 +170,7 @@ with tab3:
         if st.button("Store Data"):
             try:
                 data = eval(data_to_store)  # Convert string to dict (be cautious with eval)
-                response = requests.post(f"{FASTAPI_URL}/store_data", json=data)
+                response = get_http_session().post(f"{FASTAPI_URL}/store_data", json=data)
                 if response.status_code == 200:
                     st.success("Data stored successfully!")
                 else:
@@ -181,7 +193,7 @@ with tab3:
                     st.error("Please provide both table name and schema.")
                 else:
                     # Send request to FastAPI backend
-                    response = requests.post(f"{FASTAPI_URL}/create-table", json={
+                    response = get_http_session().post(f"{FASTAPI_URL}/create-table", json={
                         "table_name": table_name,
                         "schema": schema
                     })
@@ -192,8 +204,7 @@ with tab3:
                         st.error(f"Failed to create table: {response.json().get('detail', 'Unknown error')}")
     with tab6:
         def get_openai_response(prompt):
-            load_dotenv()
-            client = OpenAI(api_key=os.getenv("MYKEY"))
+            client = get_openai_client()
             #api_key = st.secrets["OPENAI"]
             #client = openai.OpenAI(api_key=api_key)
             try:
@@ -0,0 +1,124 @@
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from typing import Dict, List, Optional
+
+from fastapi import HTTPException, Response
+
+import db
+
+logger = logging.getLogger(__name__)
+
+
+class _CachedRPC:
+    def __init__(self, name: str):
+        self.name = name
+        self.body: Optional[bytes] = None
+        self.etag: Optional[str] = None
+        self.refreshed_at: Optional[float] = None
+        self.refresh_ms = 0.0
+        self.refreshes = 0
+        self.last_error: Optional[str] = None
+        self.lock = asyncio.Lock()
+        self.task: Optional[asyncio.Task] = None
+
+    def age(self) -> Optional[float]:
+        return time.time() - self.refreshed_at if self.refreshed_at else None
+
+
+class AnalyticsCache:
+    """Serves Supabase RPC results from memory, refreshed in the background.
+
+    Results older than `max_age` are still served while a refresh runs
+    (stale-while-revalidate), and `start()` refreshes every RPC on a
+    schedule. Responses carry an ETag so clients can get 304s.
+    """
+
+    def __init__(self, supabase, rpc_names: List[str], max_age: float = 300, refresh_interval: float = 300):
+        self.supabase = supabase
+        self.max_age = max_age
+        self.refresh_interval = refresh_interval
+        self._entries: Dict[str, _CachedRPC] = {name: _CachedRPC(name) for name in rpc_names}
+        self._scheduler: Optional[asyncio.Task] = None
+
+    async def refresh(self, name: str, only_if_missing: bool = False):
+        entry = self._entries[name]
+        async with entry.lock:
+            if only_if_missing and entry.body is not None:  # Another request loaded it meanwhile
+                return
+            start = time.perf_counter()
+            try:
+                response = await db.execute(self.supabase.rpc(name))
+                if not response.data:
+                    raise ValueError(f"{name} returned no data")
+            except Exception as e:
+                entry.last_error = str(e)
+                raise
+            body = json.dumps(response.data, default=str).encode()
+            entry.body = body
+            entry.etag = f'"{hashlib.sha1(body).hexdigest()}"'
+            entry.refreshed_at = time.time()
+            entry.refresh_ms = (time.perf_counter() - start) * 1000
+            entry.refreshes += 1
+            entry.last_error = None
+
+    def _refresh_in_background(self, entry: _CachedRPC):
+        if entry.task is None or entry.task.done():
+            entry.task = asyncio.create_task(self._quiet_refresh(entry.name))
+
+    async def _quiet_refresh(self, name: str):
+        try:
+            await self.refresh(name)
+        except Exception as e:
+            logger.warning("Background refresh of %s failed: %s", name, e)
+
+    async def response(self, name: str, if_none_match: Optional[str] = None) -> Response:
+        """JSON response for an RPC, or 304 when the client's ETag still matches."""
+        entry = self._entries[name]
+        if entry.body is None:
+            try:
+                await self.refresh(name, only_if_missing=True)
+            except Exception as e:
+                raise HTTPException(status_code=500, detail=f"Error fetching {name}: {e}")
+        elif entry.age() > self.max_age:
+            self._refresh_in_background(entry)
+
+        headers = {"ETag": entry.etag, "Cache-Control": "max-age=0, must-revalidate"}
+        if if_none_match and entry.etag in [tag.strip() for tag in if_none_match.split(",")]:
+            return Response(status_code=304, headers=headers)
+        return Response(content=entry.body, media_type="application/json", headers=headers)
+
+    async def start(self):
+        if self._scheduler is None:
+            self._scheduler = asyncio.create_task(self._schedule())
+
+    async def stop(self):
+        if self._scheduler is not None:
+            self._scheduler.cancel()
+            await asyncio.gather(self._scheduler, return_exceptions=True)
+            self._scheduler = None
+
+    async def _schedule(self):
+        while True:
+            await asyncio.gather(*(self._quiet_refresh(name) for name in self._entries))
+            await asyncio.sleep(self.refresh_interval)
+
+    def status(self) -> dict:
+        return {
+            "max_age_seconds": self.max_age,
+            "refresh_interval_seconds": self.refresh_interval,
+            "rpcs": {
+                name: {
+                    "cached": entry.body is not None,
+                    "age_seconds": round(entry.age(), 1) if entry.refreshed_at else None,
+                    "stale": entry.refreshed_at is not None and entry.age() > self.max_age,
+                    "last_refresh_ms": round(entry.refresh_ms, 2),
+                    "refreshes": entry.refreshes,
+                    "etag": entry.etag,
+                    "last_error": entry.last_error,
+                }
+                for name, entry in self._entries.items()
+            },
+        }
@@ -0,0 +1,107 @@
+"""Pure-Python loops vs columnar.py for transaction summaries.
+
+The loop baseline is the summary from get_filtered_transactions plus a
+per-city dict breakdown. The columnar numbers are shown twice: including
+the conversion from row dicts to arrays, and for the vectorized math alone.
+A second table times the grouped + bucketed series with many keys (SKUs
+by day over four years), where dense bucket x key bins would not fit.
+
+    python benchmarks/bench_columnar.py [rows ...]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from columnar import TransactionColumns, group_summary, summarize, time_series  # noqa: E402
+
+CITIES = ["Austin", "Boston", "Chicago", "Denver", "Miami", "Seattle"]
+SKUS = 5000
+
+
+def make_rows(n):
+    rng = random.Random(42)
+    rows = []
+    for i in range(n):
+        price = round(rng.uniform(5, 50), 2)
+        quantity = rng.randint(1, 10)
+        rows.append({
+            "id": i,
+            "date": f"{rng.randint(2021, 2024)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            "city": rng.choice(CITIES),
+            "sku": f"SKU-{rng.randint(0, SKUS - 1):04d}",
+            "price": price,
+            "quantity": quantity,
+            "total": round(price * quantity, 2),
+        })
+    return rows
+
+
+def loop_summary(rows):
+    total_sales = sum(t["total"] for t in rows)
+    avg_price = sum(t["price"] for t in rows) / len(rows)
+    total_quantity = sum(t["quantity"] for t in rows)
+    by_city = {}
+    for t in rows:
+        group = by_city.setdefault(t["city"], [0.0, 0.0, 0, 0])
+        group[0] += t["total"]
+        group[1] += t["price"]
+        group[2] += t["quantity"]
+        group[3] += 1
+    by_month = {}
+    for t in rows:
+        bucket = by_month.setdefault(t["date"][:7], [0.0, 0])
+        bucket[0] += t["total"]
+        bucket[1] += 1
+    return total_sales, avg_price, total_quantity, by_city, by_month
+
+
+def loop_sku_by_day(rows):
+    series = {}
+    for t in rows:
+        group = series.setdefault((t["date"], t["sku"]), [0.0, 0.0, 0, 0])
+        group[0] += t["total"]
+        group[1] += t["price"]
+        group[2] += t["quantity"]
+        group[3] += 1
+    return sorted(series.items())
+
+
+def columnar_compute(cols):
+    return summarize(cols), group_summary(cols), time_series(cols, "month")
+
+
+def best_of(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main(sizes):
+    print(f"{'rows':>9}  {'loops':>10}  {'columnar+load':>14}  {'columnar only':>14}")
+    for n in sizes:
+        rows = make_rows(n)
+        loops = best_of(lambda: loop_summary(rows))
+        with_load = best_of(lambda: columnar_compute(TransactionColumns(rows, "city")))
+        cols = TransactionColumns(rows, "city")
+        compute = best_of(lambda: columnar_compute(cols))
+        print(f"{n:>9}  {loops:>8.1f}ms  {with_load:>12.1f}ms  {compute:>12.1f}ms")
+
+    print(f"\nsku x day series ({SKUS} SKUs, 4 years)")
+    print(f"{'rows':>9}  {'loops':>10}  {'columnar+load':>14}  {'columnar only':>14}")
+    for n in sizes:
+        rows = make_rows(n)
+        loops = best_of(lambda: loop_sku_by_day(rows))
+        with_load = best_of(lambda: time_series(TransactionColumns(rows, "sku"), "day"))
+        cols = TransactionColumns(rows, "sku")
+        compute = best_of(lambda: time_series(cols, "day"))
+        print(f"{n:>9}  {loops:>8.1f}ms  {with_load:>12.1f}ms  {compute:>12.1f}ms")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10_000, 100_000, 1_000_000])
@@ -0,0 +1,84 @@
+"""Sequential vs concurrent fan-out for the transaction read endpoints.
+
+Runs get_unique_values and get_filtered_transactions against an in-memory
+fake Supabase that sleeps for a fixed latency on every execute(), with the
+distinct-value cache cleared before each call so every read hits "the DB".
+
+    python benchmarks/bench_fanout.py [latency_ms] [iterations]
+"""
+import asyncio
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SUPABASE_URL", "http://localhost")
+os.environ.setdefault("SUPABASE_KEY", "benchmark")
+
+import API_Database  # noqa: E402
+from API_Database import TransactionFilter, get_filtered_transactions, get_unique_values  # noqa: E402
+
+ROWS = [
+    {"id": i, "date": "2024-01-01", "city": f"city{i % 5}", "product": f"product{i % 7}",
+     "sales_rep": f"rep{i % 3}", "sku": f"sku{i % 11}", "price": 10.0, "quantity": 2, "total": 20.0}
+    for i in range(500)
+]
+
+
+class FakeQuery:
+    def __init__(self, latency, column="*"):
+        self.latency = latency
+        self.column = column
+
+    def select(self, column="*", **kwargs):
+        return FakeQuery(self.latency, column)
+
+    def eq(self, *args):
+        return self
+
+    gte = lte = eq
+
+    def execute(self):
+        time.sleep(self.latency)
+        if self.column == "*":
+            return SimpleNamespace(data=ROWS)
+        return SimpleNamespace(data=[{self.column: row[self.column]} for row in ROWS])
+
+
+class FakeSupabase:
+    def __init__(self, latency):
+        self.latency = latency
+
+    def table(self, name):
+        return FakeQuery(self.latency)
+
+
+async def timed(fn, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        API_Database.unique_values_index.invalidate()
+        await fn()
+    return (time.perf_counter() - start) / iterations * 1000
+
+
+async def main(latency_ms: float, iterations: int):
+    supabase = FakeSupabase(latency_ms / 1000)
+    cases = {
+        "get_unique_values": lambda: get_unique_values(supabase),
+        "get_filtered_transactions": lambda: get_filtered_transactions(supabase, TransactionFilter(city="city1")),
+    }
+    print(f"fake query latency {latency_ms:.0f} ms, {iterations} iterations")
+    for name, fn in cases.items():
+        API_Database.QUERY_FANOUT_LIMIT = 1
+        sequential = await timed(fn, iterations)
+        API_Database.QUERY_FANOUT_LIMIT = 4
+        concurrent = await timed(fn, iterations)
+        print(f"{name:28s} sequential {sequential:7.1f} ms   concurrent {concurrent:7.1f} ms   "
+              f"speedup {sequential / concurrent:4.1f}x")
+
+
+if __name__ == "__main__":
+    latency = float(sys.argv[1]) if len(sys.argv) > 1 else 50
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    asyncio.run(main(latency, runs))
@@ -0,0 +1,86 @@
+"""Recipe ingestion throughput: one embedding call per recipe vs batched.
+
+Ingests synthetic recipes into a fresh temporary RecipeIndex through
+RecipeIngestor with batch_size=1 and with the configured batch size, then
+re-ingests the same recipes to measure the content-hash skip path. Uses the
+sentence-transformers model when it is installed; otherwise a hashing
+bag-of-words embedder stands in (pass --hashing to force it), which only
+shows pipeline overhead, not model batching gains.
+
+    python benchmarks/bench_recipe_ingest.py [recipes] [batch_size] [--hashing]
+"""
+import asyncio
+import hashlib
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from recipe_index import RecipeIndex  # noqa: E402
+from recipes import RecipeIngestor, validate_recipes  # noqa: E402
+
+INGREDIENTS = ["rice", "tomato", "onion", "pepper", "flour", "egg", "milk", "butter", "garlic", "ginger",
+               "chicken", "beef", "beans", "plantain", "yam", "okra", "spinach", "lime", "avocado", "coconut"]
+
+
+def synthetic_recipes(n: int):
+    rng = np.random.default_rng(0)
+    for i in range(n):
+        ingredients = list(rng.choice(INGREDIENTS, 5, replace=False))
+        yield {
+            "name": f"Recipe {i}",
+            "description": f"A {ingredients[0]} and {ingredients[1]} dish, variation {i}",
+            "ingredients": ingredients,
+            "instructions": f"Combine {', '.join(ingredients)} and cook for {10 + i % 50} minutes.",
+        }
+
+
+def hashing_embed(texts, dim=384):
+    vectors = np.zeros((len(texts), dim), dtype=np.float32)
+    for row, text in enumerate(texts):
+        for word in text.lower().split():
+            vectors[row, int(hashlib.md5(word.encode()).hexdigest(), 16) % dim] += 1
+    return vectors
+
+
+def pick_embedder(force_hashing: bool):
+    if not force_hashing:
+        try:
+            from recipes import embed_texts
+            embed_texts(["warm up"])
+            return "sentence-transformers", embed_texts
+        except ImportError:
+            pass
+    return "hashing", hashing_embed
+
+
+async def ingest(embed, recipes, batch_size: int, index: RecipeIndex):
+    ingestor = RecipeIngestor(embed, batch_size=batch_size)
+    start = time.perf_counter()
+    result = await ingestor.ingest(index, validate_recipes(recipes))
+    return time.perf_counter() - start, result
+
+
+def main():
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    n = int(args[0]) if args else 3000
+    batch_size = int(args[1]) if len(args) > 1 else 64
+    name, embed = pick_embedder("--hashing" in sys.argv)
+    recipes = list(synthetic_recipes(n))
+    print(f"{n} recipes, embedder: {name}")
+
+    for label, size in (("one at a time", 1), (f"batch_size={batch_size}", batch_size)):
+        with tempfile.TemporaryDirectory() as path:
+            index = RecipeIndex(path)
+            seconds, result = asyncio.run(ingest(embed, recipes, size, index))
+            print(f"{label:>16}: {seconds:.2f}s  {n / seconds:,.0f} recipes/sec  (added {result['added']})")
+            seconds, result = asyncio.run(ingest(embed, recipes, size, index))
+            print(f"{'re-ingest':>16}: {seconds:.2f}s  {n / seconds:,.0f} recipes/sec  (skipped {result['skipped']})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Cold-start cost of the API: import, lifespan startup and first request.
+
+Each run starts a fresh interpreter, imports the app module, runs the
+lifespan (which loads numpy and memory-maps the recipe index) by entering
+Starlette's TestClient, then serves GET /, so nothing is shared between
+runs. `cold_start_ms` is the sum. Also lists which heavy SDKs the import
+itself pulled in, before the lifespan ran.
+
+    python benchmarks/bench_startup.py [module] [runs]
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ["supabase", "openai", "google.generativeai", "google.genai", "numpy"]
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+module = __import__(sys.argv[1])
+imported = time.perf_counter()
+loaded = [name for name in sys.argv[2:] if name in sys.modules]
+from fastapi.testclient import TestClient
+client = TestClient(module.app)
+entering = time.perf_counter()
+with client:
+    started = time.perf_counter()
+    client.get("/")
+    served = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "lifespan_ms": (started - entering) * 1000,
+    "first_request_ms": (served - started) * 1000,
+    "cold_start_ms": (imported - start + served - entering) * 1000,
+    "loaded": loaded,
+}))
+"""
+
+
+def run_once(module: str) -> dict:
+    env = dict(os.environ)
+    env.setdefault("SUPABASE_URL", "http://localhost")
+    env.setdefault("SUPABASE_KEY", "benchmark")
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE, module, *HEAVY_MODULES],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    module = sys.argv[1] if len(sys.argv) > 1 else "main"
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    results = [run_once(module) for _ in range(runs)]
+    for key in ("import_ms", "lifespan_ms", "first_request_ms", "cold_start_ms"):
+        values = [result[key] for result in results]
+        print(f"{module} {key}: median {statistics.median(values):.1f}  min {min(values):.1f}  max {max(values):.1f}")
+    print(f"{module} heavy modules loaded at import: {', '.join(results[0]['loaded']) or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional
+
+import db
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Small thread-safe TTL cache with optional LRU size bound and hit/miss counters."""
+
+    def __init__(self, ttl: float, maxsize: Optional[int] = None):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[object, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is not _MISSING and item[0] > time.monotonic():
+                self._data.move_to_end(key)
+                self.hits += 1
+                return item[1]
+            if item is not _MISSING:
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def peek(self, key, default=None):
+        """Like get() but without touching LRU order or the counters."""
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is not _MISSING and item[0] > time.monotonic():
+                return item[1]
+            return default
+
+    def set(self, key, value, ttl: Optional[float] = None):
+        with self._lock:
+            self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+            self._data.move_to_end(key)
+            if self.maxsize is not None:
+                while len(self._data) > self.maxsize:
+                    self._data.popitem(last=False)
+
+    def invalidate(self, key=_MISSING):
+        """Drop one key, or everything when called without arguments."""
+        with self._lock:
+            if key is _MISSING:
+                self._data.clear()
+            else:
+                self._data.pop(key, None)
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "size": len(self._data),
+            "ttl_seconds": self.ttl,
+        }
+
+
+class DistinctValueIndex:
+    """Sorted distinct values per column, loaded once per TTL."""
+
+    def __init__(self, table: str, columns: List[str], ttl: float = 300, loader=None):
+        self.table = table
+        self.columns = columns
+        self.loader = loader  # async (supabase, table, column) -> values; defaults to a column scan
+        self._cache = TTLCache(ttl)
+
+    async def values(self, supabase, column: str) -> List:
+        cached = self._cache.get(column)
+        if cached is None:
+            if self.loader:
+                values = await self.loader(supabase, self.table, column)
+            else:
+                values = [row[column] for row in (await db.execute(supabase.table(self.table).select(column))).data]
+            cached = sorted({value for value in values if value is not None})
+            self._cache.set(column, cached)
+        return cached
+
+    def invalidate(self, column: Optional[str] = None):
+        if column is None:
+            self._cache.invalidate()
+        else:
+            self._cache.invalidate(column)
+
+    def stats(self) -> dict:
+        return {"table": self.table, "columns": self.columns, **self._cache.stats()}
@@ -0,0 +1,124 @@
+"""Vectorized transaction summaries over NumPy columns."""
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+class TransactionColumns:
+    """Transaction rows transposed into one NumPy array per column.
+
+    The group_by column is stored as integer codes into `group_keys`. Pass
+    the same dict for every page so codes stay consistent across pages.
+    """
+
+    def __init__(self, rows: List[dict], group_by: Optional[str] = None,
+                 group_keys: Optional[Dict[str, int]] = None):
+        self.count = len(rows)
+        self.total = np.fromiter((row["total"] or 0 for row in rows), dtype=np.float64, count=self.count)
+        self.price = np.fromiter((row["price"] or 0 for row in rows), dtype=np.float64, count=self.count)
+        self.quantity = np.fromiter((row["quantity"] or 0 for row in rows), dtype=np.float64, count=self.count)
+        self.date = np.array([str(row["date"])[:10] for row in rows], dtype="datetime64[D]")
+        self.group = None
+        self.group_keys = None
+        if group_by:
+            keys = self.group_keys = {} if group_keys is None else group_keys
+            values = ("" if row.get(group_by) is None else str(row[group_by]) for row in rows)
+            self.group = np.fromiter((keys.setdefault(v, len(keys)) for v in values), dtype=np.int64, count=self.count)
+
+    @classmethod
+    def concat(cls, parts: List["TransactionColumns"]) -> "TransactionColumns":
+        """Join per-page columns, so callers can drop each page of dicts as it arrives."""
+        cols = cls([])
+        if not parts:
+            return cols
+        cols.count = sum(part.count for part in parts)
+        for name in ("total", "price", "quantity", "date"):
+            setattr(cols, name, np.concatenate([getattr(part, name) for part in parts]))
+        if parts[0].group is not None:
+            cols.group = np.concatenate([part.group for part in parts])
+            cols.group_keys = parts[0].group_keys
+        return cols
+
+
+def _stats(total, price_sum, quantity, count) -> dict:
+    return {
+        "total_sales": round(float(total), 2),
+        "avg_price": round(float(price_sum / count), 2) if count else 0,
+        "total_quantity": int(quantity),
+        "transaction_count": int(count),
+    }
+
+
+def _grouped(codes: np.ndarray, size: int, cols: TransactionColumns):
+    return (
+        np.bincount(codes, weights=cols.total, minlength=size),
+        np.bincount(codes, weights=cols.price, minlength=size),
+        np.bincount(codes, weights=cols.quantity, minlength=size),
+        np.bincount(codes, minlength=size),
+    )
+
+
+def summarize(cols: TransactionColumns) -> dict:
+    return _stats(cols.total.sum(), cols.price.sum(), cols.quantity.sum(), cols.count)
+
+
+def _sorted_keys(cols: TransactionColumns):
+    names = list(cols.group_keys)  # Insertion order == code
+    return sorted(range(len(names)), key=names.__getitem__), names
+
+
+def group_summary(cols: TransactionColumns) -> List[dict]:
+    """Per-group totals for the column given as group_by, sorted by key."""
+    if cols.group is None or not cols.count:
+        return []
+    order, names = _sorted_keys(cols)
+    totals, prices, quantities, counts = _grouped(cols.group, len(names), cols)
+    return [
+        {"key": names[i], **_stats(totals[i], prices[i], quantities[i], counts[i])}
+        for i in order if counts[i]
+    ]
+
+
+def bucket_dates(dates: np.ndarray, bucket: str) -> np.ndarray:
+    if bucket == "month":
+        return dates.astype("datetime64[M]").astype("datetime64[D]")
+    if bucket == "week":
+        # 1970-01-01 was a Thursday; shift so buckets start on Monday
+        days = dates.astype(np.int64)
+        return (days - (days + 3) % 7).astype("datetime64[D]")
+    return dates
+
+
+def time_series(cols: TransactionColumns, bucket: str) -> List[dict]:
+    """Totals per date bucket, split by group when the columns were built with group_by."""
+    if not cols.count:
+        return []
+    # Day numbers offset from the first bucket give dense codes without sorting
+    days = bucket_dates(cols.date, bucket).astype(np.int64)
+    first = days.min()
+    bucket_codes = days - first
+    span = int(bucket_codes.max()) + 1
+
+    if cols.group is None:
+        totals, prices, quantities, counts = _grouped(bucket_codes, span, cols)
+        return [
+            {"bucket": str(np.datetime64(int(first + b), "D")), **_stats(totals[b], prices[b], quantities[b], counts[b])}
+            for b in np.flatnonzero(counts)
+        ]
+
+    order, names = _sorted_keys(cols)
+    # One bin per (bucket, key) pair that occurs, not per bucket x key in the range
+    pairs, inverse = np.unique(bucket_codes * len(names) + cols.group, return_inverse=True)
+    totals, prices, quantities, counts = _grouped(inverse.reshape(-1), len(pairs), cols)
+    pair_buckets, pair_keys = np.divmod(pairs, len(names))
+    key_rank = np.empty(len(names), dtype=np.int64)
+    key_rank[order] = np.arange(len(names))
+    nonzero = np.flatnonzero(counts)
+    nonzero = nonzero[np.lexsort((key_rank[pair_keys[nonzero]], pair_buckets[nonzero]))]
+    labels = np.datetime_as_string((first + pair_buckets[nonzero]).astype("datetime64[D]")).tolist()
+    return [
+        {"bucket": label, "key": names[k], **_stats(t, p, q, c)}
+        for label, k, t, p, q, c in zip(labels, pair_keys[nonzero].tolist(), totals[nonzero].tolist(),
+                                         prices[nonzero].tolist(), quantities[nonzero].tolist(),
+                                         counts[nonzero].tolist())
+    ]
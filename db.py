@@ -0,0 +1,83 @@
+"""Shared Supabase access for the API.
+
+All routes use one Supabase client backed by a pooled HTTP/2 httpx
+connection. Its blocking `execute()` calls run on a bounded thread pool,
+so a slow query only holds one worker and never the event loop.
+"""
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import httpx
+from dotenv import load_dotenv
+from supabase import Client, ClientOptions, create_client
+
+load_dotenv()
+
+SUPABASE_URL = os.getenv("SUPABASE_URL")
+SUPABASE_KEY = os.getenv("SUPABASE_KEY")
+DB_MAX_CONCURRENCY = int(os.getenv("DB_MAX_CONCURRENCY", "16"))
+DB_QUERY_TIMEOUT = float(os.getenv("DB_QUERY_TIMEOUT", "15"))
+
+_client: Optional[Client] = None
+_client_lock = threading.Lock()
+_executor = ThreadPoolExecutor(max_workers=DB_MAX_CONCURRENCY, thread_name_prefix="supabase")
+_slots = asyncio.Semaphore(DB_MAX_CONCURRENCY)
+
+
+def get_client() -> Client:
+    """Return the process-wide Supabase client, creating it on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                http_client = httpx.Client(
+                    http2=True,
+                    timeout=DB_QUERY_TIMEOUT,
+                    limits=httpx.Limits(
+                        max_connections=DB_MAX_CONCURRENCY,
+                        max_keepalive_connections=DB_MAX_CONCURRENCY,
+                    ),
+                )
+                _client = create_client(
+                    SUPABASE_URL,
+                    SUPABASE_KEY,
+                    options=ClientOptions(
+                        postgrest_client_timeout=DB_QUERY_TIMEOUT,
+                        httpx_client=http_client,
+                    ),
+                )
+    return _client
+
+
+async def run(fn, *args, timeout: Optional[float] = None):
+    """Run a blocking Supabase call on the DB pool, capped at DB_MAX_CONCURRENCY in flight."""
+    await _slots.acquire()
+    try:
+        future = asyncio.get_running_loop().run_in_executor(_executor, fn, *args)
+    except BaseException:
+        _slots.release()
+        raise
+    # Free the slot when the thread is done with the client, not when the caller stops waiting
+    future.add_done_callback(lambda _: _slots.release())
+    return await asyncio.wait_for(asyncio.shield(future), timeout or DB_QUERY_TIMEOUT)
+
+
+async def execute(query, timeout: Optional[float] = None):
+    """Await a PostgREST query builder (table/rpc/insert ...) without blocking the loop."""
+    return await run(query.execute, timeout=timeout)
+
+
+async def gather(*aws, limit: Optional[int] = None):
+    """asyncio.gather with at most `limit` of these awaitables running at once."""
+    if not limit:
+        return await asyncio.gather(*aws)
+    local_slots = asyncio.Semaphore(limit)
+
+    async def bounded(aw):
+        async with local_slots:
+            return await aw
+
+    return await asyncio.gather(*(bounded(aw) for aw in aws))
@@ -0,0 +1,117 @@
+import asyncio
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+from fastapi import HTTPException
+
+from cache import TTLCache
+
+
+class GitHubClient:
+    """Async GitHub API client sharing one pooled connection set.
+
+    GETs are sent with If-None-Match when an ETag from an earlier response is
+    known, so unchanged resources come back as a 304 (which GitHub does not
+    count against the rate limit) and the stored body is reused. The repo list
+    follows Link-header pagination, fetching the remaining pages concurrently,
+    and is cached for `cache_ttl` seconds.
+    """
+
+    def __init__(self, token: Optional[str], base_url: str = "https://api.github.com",
+                 cache_ttl: float = 60, per_page: int = 100, page_concurrency: int = 4,
+                 timeout: float = 15, max_connections: int = 10):
+        self.token = token
+        self.base_url = base_url.rstrip("/")
+        self.per_page = per_page
+        self.page_concurrency = page_concurrency
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.requests = 0
+        self.not_modified = 0
+        self._client: Optional[httpx.AsyncClient] = None
+        self._etags: Dict[Tuple[str, tuple], Tuple[str, object, Dict[str, dict]]] = {}
+        self._repo_cache = TTLCache(cache_ttl)
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            headers = {"Accept": "application/vnd.github.v3+json"}
+            if self.token:
+                headers["Authorization"] = f"token {self.token}"
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers=headers,
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=self.max_connections,
+                                    max_keepalive_connections=self.max_connections),
+            )
+        return self._client
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _get(self, path: str, params: Optional[dict] = None):
+        """GET returning (data, links), revalidating with the stored ETag when there is one."""
+        key = (path, tuple(sorted((params or {}).items())))
+        cached = self._etags.get(key)
+        headers = {"If-None-Match": cached[0]} if cached else {}
+        self.requests += 1
+        response = await self.client.get(path, params=params, headers=headers)
+        if response.status_code == 304 and cached:
+            self.not_modified += 1
+            return cached[1], cached[2]
+        if response.status_code != 200:
+            raise HTTPException(status_code=response.status_code, detail=_error_detail(response))
+        data = response.json()
+        if "ETag" in response.headers:
+            self._etags[key] = (response.headers["ETag"], data, response.links)
+        return data, response.links
+
+    async def list_repos(self) -> List[dict]:
+        """All repos of the authenticated user, across every page."""
+        repos = self._repo_cache.get("repos")
+        if repos is not None:
+            return repos
+
+        params = {"per_page": self.per_page, "page": 1}
+        first, links = await self._get("/user/repos", params)
+        last_page = 1
+        if "last" in links:
+            last_page = int(httpx.URL(links["last"]["url"]).params.get("page", 1))
+
+        slots = asyncio.Semaphore(self.page_concurrency)
+
+        async def fetch(page: int):
+            async with slots:
+                data, _ = await self._get("/user/repos", {**params, "page": page})
+                return data
+
+        pages = await asyncio.gather(*(fetch(page) for page in range(2, last_page + 1)))
+        repos = [repo for page in [first, *pages] for repo in page]
+        self._repo_cache.set("repos", repos)
+        return repos
+
+    async def create_repo(self, repo_data: dict) -> dict:
+        self.requests += 1
+        response = await self.client.post("/user/repos", json=repo_data)
+        if response.status_code != 201:
+            raise HTTPException(status_code=response.status_code, detail=_error_detail(response))
+        self._repo_cache.invalidate()
+        return response.json()
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "not_modified": self.not_modified,
+            "etags": len(self._etags),
+            "repo_cache": self._repo_cache.stats(),
+        }
+
+
+def _error_detail(response: httpx.Response):
+    try:
+        return response.json()
+    except ValueError:
+        return response.text
@@ -0,0 +1,86 @@
+import hashlib
+import json
+import logging
+import os
+import re
+from typing import Optional
+
+import db
+from cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+BYPASS_HEADER = "x-cache-bypass"
+
+
+def normalize_prompt(prompt: str) -> str:
+    return re.sub(r"\s+", " ", prompt).strip()
+
+
+def prompt_hash(prompt: str) -> str:
+    """Hash of the normalized prompt; stored as gpt_responses.prompt_hash for persistent lookups."""
+    return hashlib.sha256(normalize_prompt(prompt).encode()).hexdigest()
+
+
+def bypass_requested(headers) -> bool:
+    """True when the caller sent X-Cache-Bypass: 1/true or Cache-Control: no-cache."""
+    if headers.get(BYPASS_HEADER, "").lower() in ("1", "true", "yes"):
+        return True
+    return "no-cache" in headers.get("cache-control", "").lower()
+
+
+class PromptCache:
+    """LRU + TTL cache of LLM responses keyed on normalized prompt, model and parameters.
+
+    With a `table`, in-memory misses fall back to the newest stored response
+    with the same normalized prompt (its `prompt_hash` column) and model name,
+    e.g. the gpt_responses log. A failed lookup is logged and treated as a miss.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 3600, table: Optional[str] = None):
+        self.table = table
+        self.persistent_hits = 0
+        self._memory = TTLCache(ttl, maxsize)
+
+    @staticmethod
+    def key(prompt: str, model: str, **params) -> str:
+        raw = json.dumps([normalize_prompt(prompt), model, params], sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    async def get(self, prompt: str, model: str, supabase=None, model_name: Optional[str] = None,
+                  **params) -> Optional[str]:
+        key = self.key(prompt, model, **params)
+        text = self._memory.get(key)
+        if text is not None or not (self.table and supabase and model_name):
+            return text
+
+        try:
+            response = await db.execute(
+                supabase.table(self.table)
+                .select("response")
+                .eq("prompt_hash", prompt_hash(prompt))
+                .eq("model_name", model_name)
+                .order("created_at", desc=True)
+                .limit(1)
+            )
+        except Exception as e:
+            logger.warning("Persistent LLM cache lookup in %s failed: %s", self.table, e)
+            return None
+        if response.data:
+            text = response.data[0]["response"]
+            self.persistent_hits += 1
+            self._memory.set(key, text)
+        return text
+
+    def set(self, prompt: str, model: str, text: str, **params):
+        self._memory.set(self.key(prompt, model, **params), text)
+
+    def stats(self) -> dict:
+        return {**self._memory.stats(), "persistent_hits": self.persistent_hits, "maxsize": self._memory.maxsize}
+
+
+llm_cache = PromptCache(
+    maxsize=int(os.getenv("LLM_CACHE_SIZE", "1024")),
+    ttl=float(os.getenv("LLM_CACHE_TTL", "3600")),
+    table="gpt_responses" if os.getenv("LLM_CACHE_PERSISTENT", "").lower() in ("1", "true") else None,
+)
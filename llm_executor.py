@@ -0,0 +1,179 @@
+import asyncio
+import os
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from fastapi import HTTPException
+
+
+class ProviderPool:
+    """Bounded thread pool for one LLM provider's blocking SDK calls.
+
+    At most `max_concurrency` calls run at once and `max_queue` more may wait;
+    anything beyond that is rejected with a 429 instead of piling up.
+    """
+
+    def __init__(self, name: str, max_concurrency: int = 4, max_queue: int = 16, timeout: float = 60.0):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.abandoned = 0
+        self.abandoned_running = 0
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix=f"llm-{name}")
+
+    def _admit(self):
+        if self.in_flight >= self.max_concurrency + self.max_queue:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=429,
+                detail=f"Too many concurrent {self.name} requests, please retry shortly.",
+                headers={"Retry-After": "1"},
+            )
+
+    def _track(self, future):
+        """Hold a slot until the worker thread finishes, even if the caller stopped waiting."""
+        self.in_flight += 1
+        future.add_done_callback(self._release)
+
+    def _release(self, future):
+        self.in_flight -= 1
+
+    def _reserve(self):
+        """Take a slot now and return a callback that frees it once, however often it is called."""
+        self.in_flight += 1
+        held = [True]
+
+        def release(*_):
+            try:
+                held.pop()
+            except IndexError:
+                return
+            self.in_flight -= 1
+        return release
+
+    def _abandon(self, future):
+        """Count a call whose caller gave up while its thread is still running."""
+        self.abandoned += 1
+        self.abandoned_running += 1
+        future.add_done_callback(self._abandoned_done)
+
+    def _abandoned_done(self, future):
+        self.abandoned_running -= 1
+
+    async def run(self, fn, *args, **kwargs):
+        self._admit()
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._executor, partial(fn, *args, **kwargs))
+        self._track(future)
+        try:
+            # shield() keeps the executor future alive, so its slot is released when the thread ends
+            result = await asyncio.wait_for(asyncio.shield(future), self.timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            self._abandon(future)
+            raise HTTPException(status_code=504, detail=f"{self.name} request timed out after {self.timeout:.0f}s")
+        except asyncio.CancelledError:
+            if not future.done():
+                self._abandon(future)
+            raise
+        self.completed += 1
+        return result
+
+    def stream(self, fn, *args, **kwargs):
+        """Iterate a blocking generator `fn(*args, **kwargs)` in the pool as an async generator.
+
+        Admission is checked and the slot reserved here, before the caller
+        starts a response, so a saturated pool still answers 429. The slot is
+        freed when the producer thread ends, or when the generator is dropped
+        without being iterated. `timeout` bounds the wait per chunk.
+        """
+        self._admit()
+        release = self._reserve()
+        stream = self._stream(partial(fn, *args, **kwargs), release)
+        weakref.finalize(stream, release)
+        return stream
+
+    async def _stream(self, produce_items, release):
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        finished = object()
+        cancelled = threading.Event()
+
+        def produce():
+            try:
+                for item in produce_items():
+                    if cancelled.is_set():  # Client went away, stop pulling tokens
+                        return
+                    loop.call_soon_threadsafe(queue.put_nowait, item)
+                loop.call_soon_threadsafe(queue.put_nowait, finished)
+            except Exception as e:
+                loop.call_soon_threadsafe(queue.put_nowait, e)
+
+        future = loop.run_in_executor(self._executor, produce)
+        future.add_done_callback(release)
+        try:
+            while True:
+                item = await asyncio.wait_for(queue.get(), self.timeout)
+                if item is finished:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+            self.completed += 1
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise HTTPException(status_code=504, detail=f"{self.name} stream stalled for {self.timeout:.0f}s")
+        finally:
+            cancelled.set()  # The producer stops at its next item; the slot is freed when it returns
+            if not future.done():
+                self._abandon(future)
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "timeout_seconds": self.timeout,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+            "abandoned": self.abandoned,
+            "abandoned_running": self.abandoned_running,
+        }
+
+
+def _pool_from_env(name: str) -> ProviderPool:
+    prefix = f"LLM_{name.upper()}"
+    return ProviderPool(
+        name,
+        max_concurrency=int(os.getenv(f"{prefix}_CONCURRENCY", "4")),
+        max_queue=int(os.getenv(f"{prefix}_QUEUE", "16")),
+        timeout=float(os.getenv(f"{prefix}_TIMEOUT", "60")),
+    )
+
+
+llm_pools = {
+    "gemini": _pool_from_env("gemini"),
+    "openai": _pool_from_env("openai"),
+}
+
+
+async def run_llm(provider: str, fn, *args, **kwargs):
+    """Run a blocking LLM SDK call on the provider's pool."""
+    return await llm_pools[provider].run(fn, *args, **kwargs)
+
+
+def stream_llm(provider: str, fn, *args, **kwargs):
+    """Stream items from a blocking LLM SDK generator on the provider's pool."""
+    return llm_pools[provider].stream(fn, *args, **kwargs)
+
+
+def llm_stats() -> dict:
+    return {name: pool.stats() for name, pool in llm_pools.items()}
@@ -1,131 +1,102 @@
 import os
-from fastapi import FastAPI, HTTPException
-from supabase import create_client, Client
+from contextlib import asynccontextmanager
 from typing import Optional
-from fastapi.middleware.cors import CORSMiddleware
-import google.generativeai as genai
+
 from dotenv import load_dotenv
-import uuid
+from fastapi import APIRouter, FastAPI, HTTPException, Header
+from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from datetime import datetime
-#from API_Database import TransactionFilter, get_filtered_transactions, get_unique_values, get_recent_transactions
-import requests
-from openai import OpenAI
-import time
-from google import genai
-from google.genai import types
-from google.oauth2 import service_account
-
-app = FastAPI()
-
 
+from providers import get_vertex_client, lazy
+from recipes import get_recipe_index, router as recipes_router
+from video_storage import create_video_store, video_response
 
 # Load environment variables
 load_dotenv()
 
-# Initialize FastAPI app
-app = FastAPI()
-
-# Initialize Supabase client
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_KEY")
-SERVICE_ROLE_KEY = os.getenv("SERVICE_ROLE_KEY")
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
-
-# Configure Google Generative AI API key
-genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+router = APIRouter()
 
-# Initialize the Generative AI model
-model = genai.GenerativeModel('gemini-2.0-flash-exp')
 
-#OpenAIAPI
-#client = OpenAI(api_key="your-api-key-here")
-client = OpenAI(api_key=os.getenv("OPENAI"))
-MODEL = "03-mini"
+@lazy
+def get_video_store():
+    backend = os.getenv("VIDEO_STORAGE_BACKEND", "local")
+    if backend == "supabase":
+        import db
+        return create_video_store(db.get_client())
+    return create_video_store()
 
 
-#Github
-GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
-GITHUB_API_URL = os.getenv("GITHUB_API_URL")
+@lazy
+def get_video_jobs():
+    from google.genai import types
+    from video_jobs import VideoJobQueue
 
-headers = {
-    "Authorization": f"token {GITHUB_TOKEN}",
-    "Accept": "application/vnd.github.v3+json"
-}
+    return VideoJobQueue(
+        get_vertex_client(),
+        model="veo-3.0-fast-generate-preview",
+        store=get_video_store(),
+        config=types.GenerateVideosConfig(
+            aspect_ratio="16:9",
+            number_of_videos=1,
+            duration_seconds=8
+        ),
+        workers=int(os.getenv("VIDEO_WORKERS", "2")),
+    )
 
-# CORS middleware setup
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=   ["*"] ,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # Allow all origins (or specify your frontend URL)
-    allow_credentials=True,
-    allow_methods=["*"],  # Allow all methods (GET, POST, etc.)
-    allow_headers=["*"],  # Allow all headers
-)
-
-
-@app.get("/")
+@router.get("/")
 async def root():
     return {"message": "My Taste"}
 
 
-
-app = FastAPI()
-
 class VideoRequest(BaseModel):
     prompt: str
     record_id: str
 
-# Initialize credentials & client globally (or per request if needed)
-creds = service_account.Credentials.from_service_account_file(
-    "path/to/your/service_account.json",
-    scopes=["https://www.googleapis.com/auth/cloud-platform"],
-)
-client = genai.Client(
-    vertexai=True,
-    project="fintastic-godrej",
-    location="us-central1",
-    credentials=creds,
-)
-
-@app.post("/generate-video")
+@router.post("/generate-video", status_code=202)
 async def generate_video(request: VideoRequest):
+    """Queue a video generation job and return its id immediately."""
     try:
-        operation = client.models.generate_videos(
-            model="veo-3.0-fast-generate-preview",
-            prompt=request.prompt,
-            config=types.GenerateVideosConfig(
-                aspect_ratio="16:9",
-                number_of_videos=1,
-                duration_seconds=8
-            ),
-        )
-
-        while not operation.done:
-            time.sleep(10)
-            operation = client.operations.get(operation)
-
-        if operation.done and operation.response:
-            videos = []
-            for idx, generated_video in enumerate(operation.response.generated_videos):
-                video_bytes = generated_video.video.video_bytes
-                # You can upload to your storage here or return bytes/base64
-                videos.append({
-                    "filename": f"{request.record_id}_{idx}.mp4",
-                    "video_bytes": video_bytes.hex()  # or base64 encode
-                })
-            return {"status": "success", "videos": videos}
-        else:
-            raise HTTPException(status_code=500, detail="Operation did not complete successfully")
-
+        job = await get_video_jobs().submit(request.prompt, request.record_id)
+        return {"job_id": job.job_id, "status": job.status}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-
+@router.get("/generate-video/{job_id}")
+async def get_video_job(job_id: str):
+    """Report the status of a video generation job, with its videos once done."""
+    job = get_video_jobs().get(job_id) if get_video_jobs.initialized() else None
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Video job {job_id} not found.")
+    return job
+
+@router.get("/videos/{key}")
+async def download_video(key: str, range: Optional[str] = Header(None)):
+    """Stream a generated video from storage, with HTTP Range support."""
+    return video_response(get_video_store(), key, range)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    get_recipe_index()  # Memory-maps the saved index once, before the first query
+    yield
+    if get_video_jobs.initialized():
+        await get_video_jobs().stop()
+
+
+def create_app() -> FastAPI:
+    """Build the API. Provider clients are created on first use, not here."""
+    app = FastAPI(lifespan=lifespan)
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],  # Allow all origins (or specify your frontend URL)
+        allow_credentials=True,
+        allow_methods=["*"],  # Allow all methods (GET, POST, etc.)
+        allow_headers=["*"],  # Allow all headers
+    )
+    app.include_router(router)
+    app.include_router(recipes_router)
+    return app
+
+
+app = create_app()
@@ -1,17 +1,29 @@
 import os
-from fastapi import FastAPI, HTTPException
-from supabase import create_client, Client
-from typing import Optional
+import asyncio
+from fastapi import FastAPI, HTTPException, Header, Query as QueryParam, Request, Response
+from fastapi.responses import StreamingResponse
+from supabase import Client
+from typing import Optional, List
 from fastapi.middleware.cors import CORSMiddleware
 import google.generativeai as genai
 from dotenv import load_dotenv
 import uuid
+import json
 from pydantic import BaseModel
-from datetime import datetime
-from API_Database import TransactionFilter, get_filtered_transactions, get_unique_values, get_recent_transactions
-import requests
-from bs4 import BeautifulSoup
+from datetime import date, datetime
+from API_Database import TransactionFilter, get_filtered_transactions, get_unique_values, get_recent_transactions, unique_values_index
+from API_Database import get_transactions_page, export_transactions, get_transaction_breakdown
+from API_Database import ForecastQuery, forecast_cache, get_sales_forecast, parse_forecast_fields
 from openai import OpenAI
+import db
+from llm_cache import llm_cache, bypass_requested, normalize_prompt, prompt_hash
+from llm_executor import run_llm, stream_llm, llm_stats
+from write_behind import WriteBehindBuffer
+from analytics_cache import AnalyticsCache
+from product_catalog import ProductCatalog
+from snapshot import configure_snapshot, fresh_snapshot
+from github_client import GitHubClient
+from style_scraper import StyleScraper
 
 # Load environment variables
 load_dotenv()
@@ -22,13 +34,23 @@ app = FastAPI()
 # Initialize Supabase client
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+supabase: Client = db.get_client()
+
+# gpt_responses rows are logged in bulk, off the request path
+gpt_response_log = WriteBehindBuffer(
+    supabase,
+    "gpt_responses",
+    flush_size=int(os.getenv("GPT_LOG_FLUSH_SIZE", "50")),
+    flush_interval=float(os.getenv("GPT_LOG_FLUSH_INTERVAL", "2")),
+)
 
 # Configure Google Generative AI API key
 genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
 
 # Initialize the Generative AI model
-model = genai.GenerativeModel('gemini-2.0-flash-exp')
+GEMINI_MODEL = 'gemini-2.0-flash-exp'
+GEMINI_MODEL_NAME = "Google Generative AI"  # model_name stored in gpt_responses
+model = genai.GenerativeModel(GEMINI_MODEL)
 
 #OpenAIAPI
 #client = OpenAI(api_key="your-api-key-here")
@@ -40,10 +62,8 @@ MODEL = "03-mini"
 GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
 GITHUB_API_URL = os.getenv("GITHUB_API_URL")
 
-headers = {
-    "Authorization": f"token {GITHUB_TOKEN}",
-    "Accept": "application/vnd.github.v3+json"
-}
+github = GitHubClient(GITHUB_TOKEN, GITHUB_API_URL or "https://api.github.com",
+                      cache_ttl=float(os.getenv("GITHUB_REPO_CACHE_TTL", "60")))
 
 # CORS middleware setup
 app.add_middleware(
@@ -63,87 +83,161 @@ app.add_middleware(
 )
 
 
+# Dashboard RPCs, refreshed in the background and served from memory
+analytics_cache = AnalyticsCache(
+    supabase,
+    ["get_analytics_pack", "get_average_price_by_type"],
+    max_age=float(os.getenv("ANALYTICS_MAX_AGE", "300")),
+    refresh_interval=float(os.getenv("ANALYTICS_REFRESH_INTERVAL", "300")),
+)
+
+# products table kept in memory, refreshed by updated_at
+product_catalog = ProductCatalog(supabase, ttl=float(os.getenv("PRODUCT_CATALOG_TTL", "300")))
+
+# Optional local SQLite snapshot of transactions and sales_forecast (SNAPSHOT_PATH)
+local_snapshot = configure_snapshot(supabase)
+
+# Comma-separated TRENDING_STYLE_URLS; TRENDING_STYLES_INTERVAL=0 disables the scheduled scrape
+style_scraper = StyleScraper(
+    supabase,
+    [url.strip() for url in os.getenv(
+        "TRENDING_STYLE_URLS", "https://www.example.com/trending-hair-braiding-styles").split(",") if url.strip()],
+    interval=float(os.getenv("TRENDING_STYLES_INTERVAL", "0")),
+)
+
+@app.on_event("startup")
+async def start_background_tasks():
+    await analytics_cache.start()
+    if local_snapshot:
+        await local_snapshot.start()
+    await style_scraper.start()
+
+@app.on_event("shutdown")
+async def stop_background_tasks():
+    await gpt_response_log.close()
+    await analytics_cache.stop()
+    if local_snapshot:
+        await local_snapshot.stop()
+    await github.close()
+    await style_scraper.stop()
+
 @app.get("/")
 async def root():
     return {"message": "My Taste"}
 
 @app.get("/products")
-async def get_all_products():
-    """Fetch all products from the Supabase 'products' table."""
+async def get_all_products(ids: Optional[str] = None):
+    """Fetch all products, or only those in ?ids=1,2,3, from the in-memory catalog."""
     try:
-        response = supabase.table("products").select("*").execute()
-        if response.data:  # Check if data is returned
-            return response.data
+        if ids:
+            try:
+                product_ids = [int(pid) for pid in ids.split(",") if pid.strip()]
+            except ValueError:
+                raise HTTPException(status_code=400, detail="ids must be a comma-separated list of integers")
+            return await product_catalog.get_many(product_ids)
+
+        body = await product_catalog.list_body()
+        if body != b"[]":  # Check if data is returned
+            return Response(content=body, media_type="application/json")
         else:  # Handle empty results or errors
             raise HTTPException(status_code=500, detail="Error fetching products or no products found.")
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/products/stats")
+async def get_product_catalog_stats():
+    """Size and refresh counters of the in-memory product catalog."""
+    return product_catalog.stats()
+
 @app.get("/products/{product_id}")
 async def get_product(product_id: int):
-    """Fetch a single product by ID from the Supabase 'products' table."""
+    """Fetch a single product by ID from the in-memory catalog."""
     try:
-        response = supabase.table("products").select("*").eq("id", product_id).single().execute()
-        if response.data:  # Check if the product exists
-            return response.data
+        product = await product_catalog.get(product_id)
+        if product:  # Check if the product exists
+            return product
         else:  # Handle product not found
             raise HTTPException(status_code=404, detail=f"Product with ID {product_id} not found.")
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/generate-text")
-async def generate_text(prompt: str):
+async def generate_text(prompt: str, http_request: Request, http_response: Response):
     """Generate text using the Google Generative AI model."""
     try:
+        use_cache = not bypass_requested(http_request.headers)
+        cached = await llm_cache.get(prompt, GEMINI_MODEL, supabase, GEMINI_MODEL_NAME) if use_cache else None
+        http_response.headers["X-Cache"] = "HIT" if cached else "MISS"
+        if cached:
+            return {"generated_text": cached}
+
         # Generate content using the AI model
-        response = model.generate_content(prompt)
+        response = await run_llm("gemini", model.generate_content, prompt)
         if response.text:  # Check if the response contains text
+            llm_cache.set(prompt, GEMINI_MODEL, response.text)
             return {"generated_text": response.text}
         else:  # Handle cases where no text is generated
             raise HTTPException(status_code=500, detail="No text generated by the AI model.")
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 # Define the new route for average price by type
 @app.get("/analytics/average-price-by-type")
-async def get_average_price_by_type():
+async def get_average_price_by_type(if_none_match: Optional[str] = Header(None)):
     """Fetch the average price of products grouped by type."""
-    try:
-        response = supabase.rpc("get_average_price_by_type").execute()
-        if response.data:
-            return response.data
-        else:
-            raise HTTPException(status_code=500, detail="Error fetching average prices or no data found.")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return await analytics_cache.response("get_average_price_by_type", if_none_match)
+
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
 
-# Get all data from the transactions table
+# Get data from the transactions table, one keyset page at a time
 @app.get("/transactions")
-async def get_all_transactions():
-    """Fetch all transactions from the Supabase 'transactions' table."""
+async def get_all_transactions(request: Request, response: Response, cursor: Optional[str] = None,
+                               limit: int = QueryParam(500, ge=1, le=1000)):
+    """Fetch a page of transactions.
+
+    The body is the list of transactions as before; when more remain, the
+    X-Next-Cursor header (and a Link rel="next") carries the cursor to pass back.
+    """
     try:
-        response = supabase.table("transactions").select("*").execute()
-        if response.data:  # Check if the table contains data
-            return response.data
+        page = await get_transactions_page(supabase, cursor, limit)
+        if page.next_cursor:
+            response.headers["X-Next-Cursor"] = page.next_cursor
+            next_url = request.url.include_query_params(cursor=page.next_cursor, limit=limit)
+            response.headers["Link"] = f'<{next_url}>; rel="next"'
+        if page.transactions or cursor:
+            return page.transactions
         else:  # Handle empty table
             raise HTTPException(status_code=404, detail="No transactions found.")
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/transactions/export")
+async def export_all_transactions(format: str = QueryParam("ndjson", pattern="^(ndjson|csv)$")):
+    """Stream every transaction as NDJSON or CSV, paging through Supabase."""
+    return StreamingResponse(
+        export_transactions(supabase, format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f"attachment; filename=transactions.{format}"},
+    )
+
 @app.get("/analytics")
-async def get_analytics():
-    """Fetch the analytics pack from the Supabase database."""
-    try:
-        # Call the function get_analytics_pack() which returns the precomputed analytics
-        response = supabase.rpc("get_analytics_pack").execute()
-        
-        if response.data:  # Check if data is returned
-            return response.data
-        else:  # Handle empty results or errors
-            raise HTTPException(status_code=500, detail="Error fetching analytics data.")
-    
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+async def get_analytics(if_none_match: Optional[str] = Header(None)):
+    """Fetch the analytics pack, served from the background-refreshed cache."""
+    # get_analytics_pack() returns the precomputed analytics
+    return await analytics_cache.response("get_analytics_pack", if_none_match)
+
+@app.get("/analytics/status")
+async def get_analytics_status():
+    """Age, staleness and refresh timing of the cached analytics RPCs."""
+    return analytics_cache.status()
 
 class GenerateTextRequest(BaseModel):
     prompt: str
@@ -153,40 +247,174 @@ class GenerateTextRequest(BaseModel):
     retailer_name: str
     location: str
 
+def gpt_response_row(request: GenerateTextRequest, generated_text: str) -> dict:
+    row = {
+        "id": str(uuid.uuid4()),  # Generate a unique UUID
+        "category": request.category,
+        "sub_category": request.sub_category,
+        "prompt": request.prompt,
+        "response": generated_text,
+        "model_name": GEMINI_MODEL_NAME,
+        "created_at": datetime.now().isoformat(),
+        "user_id": request.user_id,
+        "retailer_name": request.retailer_name,
+        "location": request.location
+    }
+    if llm_cache.table:
+        # Only the persistent cache reads it; the column comes from sql/gpt_responses_prompt_hash.sql
+        row["prompt_hash"] = prompt_hash(request.prompt)
+    return row
+
+def gemini_stream(prompt: str):
+    for chunk in model.generate_content(prompt, stream=True):
+        if chunk.text:
+            yield chunk.text
+
+def sse_event(data: dict, event: Optional[str] = None) -> str:
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+async def relay_sse(chunks, on_complete=None):
+    """Relay text chunks as Server-Sent Events, then hand the full text to on_complete."""
+    parts = []
+    try:
+        async for text in chunks:
+            parts.append(text)
+            yield sse_event({"text": text})
+        if on_complete:
+            await on_complete("".join(parts))
+    except Exception as e:
+        yield sse_event({"detail": e.detail if isinstance(e, HTTPException) else str(e)}, event="error")
+        return
+    yield sse_event({}, event="done")
+
+async def cached_sse(text: str):
+    yield text
+
+def sse_response(chunks, on_complete=None, cache_status: str = "MISS"):
+    return StreamingResponse(
+        relay_sse(chunks, on_complete),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Cache": cache_status},
+    )
+
 @app.post("/generate-text2")
-async def generate_text_endpoint(request: GenerateTextRequest):
-    """Endpoint to generate text and save the prompt and response to Supabase."""
+async def generate_text_endpoint(request: GenerateTextRequest, http_request: Request, http_response: Response,
+                                 stream: bool = False):
+    """Endpoint to generate text and save the prompt and response to Supabase.
+
+    With ?stream=true the text is sent as Server-Sent Events while it is generated.
+    """
     try:
-        # Generate content using the AI model
-        response = model.generate_content(request.prompt)
-        if response.text:  # Check if the response contains text
+        use_cache = not bypass_requested(http_request.headers)
+        generated_text = await llm_cache.get(request.prompt, GEMINI_MODEL, supabase, GEMINI_MODEL_NAME) if use_cache else None
+        http_response.headers["X-Cache"] = "HIT" if generated_text else "MISS"
+
+        if stream:
+            async def save(text: str):
+                if not text:
+                    return
+                if not generated_text:
+                    llm_cache.set(request.prompt, GEMINI_MODEL, text)
+                await gpt_response_log.submit(gpt_response_row(request, text))
+
+            if generated_text:
+                return sse_response(cached_sse(generated_text), save, "HIT")
+            return sse_response(stream_llm("gemini", gemini_stream, request.prompt), save)
+
+        if not generated_text:
+            # Generate content using the AI model
+            response = await run_llm("gemini", model.generate_content, request.prompt)
             generated_text = response.text
+            if generated_text:
+                llm_cache.set(request.prompt, GEMINI_MODEL, generated_text)
 
-            # Prepare data for Supabase insertion
-            data = {
-                "id": str(uuid.uuid4()),  # Generate a unique UUID
-                "category": request.category,
-                "sub_category": request.sub_category,
-                "prompt": request.prompt,
-                "response": generated_text,
-                "model_name": "Google Generative AI",  # Replace with your actual model name
-                "created_at": datetime.now().isoformat(),
-                "user_id": request.user_id,
-                "retailer_name": request.retailer_name,
-                "location": request.location
-            }
-
-            # Insert data into the Supabase table
-            supabase.table("gpt_responses").insert(data).execute()
+        if generated_text:  # Check if the response contains text
+            # Queue the row for the next bulk insert into the Supabase table
+            await gpt_response_log.submit(gpt_response_row(request, generated_text))
 
             return {"generated_text": generated_text}
         else:  # Handle cases where no text is generated
             raise HTTPException(status_code=500, detail="No text generated by the AI model.")
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 
+BATCH_GENERATE_CONCURRENCY = int(os.getenv("BATCH_GENERATE_CONCURRENCY", "4"))
+
+class GenerateTextBatchRequest(BaseModel):
+    requests: List[GenerateTextRequest]
+    max_concurrency: Optional[int] = None  # Capped at BATCH_GENERATE_CONCURRENCY
+
+class GenerateTextBatchItem(BaseModel):
+    index: int
+    generated_text: Optional[str] = None
+    error: Optional[str] = None
+    cached: bool = False
+
+@app.post("/generate-text2/batch")
+async def generate_text_batch(batch: GenerateTextBatchRequest, http_request: Request):
+    """Generate text for many requests at once and save all rows in one insert.
+
+    Identical prompts (after whitespace normalization) are generated once.
+    """
+    if len(batch.requests) > 500:
+        raise HTTPException(status_code=400, detail="Batch cannot exceed 500 requests")
+
+    use_cache = not bypass_requested(http_request.headers)
+    limit = min(batch.max_concurrency or BATCH_GENERATE_CONCURRENCY, BATCH_GENERATE_CONCURRENCY)
+    slots = asyncio.Semaphore(max(limit, 1))
+
+    # One generation per distinct prompt
+    prompts = {}
+    for item in batch.requests:
+        prompts.setdefault(normalize_prompt(item.prompt), item.prompt)
+
+    async def generate(prompt: str):
+        cached = await llm_cache.get(prompt, GEMINI_MODEL, supabase, GEMINI_MODEL_NAME) if use_cache else None
+        if cached:
+            return cached, True
+        async with slots:
+            response = await run_llm("gemini", model.generate_content, prompt)
+        if not response.text:
+            raise ValueError("No text generated by the AI model.")
+        llm_cache.set(prompt, GEMINI_MODEL, response.text)
+        return response.text, False
+
+    outcomes = await asyncio.gather(*(generate(p) for p in prompts.values()), return_exceptions=True)
+    by_prompt = dict(zip(prompts.keys(), outcomes))
+
+    results, rows = [], []
+    for index, item in enumerate(batch.requests):
+        outcome = by_prompt[normalize_prompt(item.prompt)]
+        if isinstance(outcome, Exception):
+            detail = outcome.detail if isinstance(outcome, HTTPException) else str(outcome)
+            results.append(GenerateTextBatchItem(index=index, error=detail))
+            continue
+        generated_text, cached = outcome
+        results.append(GenerateTextBatchItem(index=index, generated_text=generated_text, cached=cached))
+        rows.append(gpt_response_row(item, generated_text))
+
+    if rows:
+        try:
+            # Insert every generated row in a single call
+            await db.execute(supabase.table("gpt_responses").insert(rows))
+        except Exception:
+            # Don't lose paid-for generations; the write-behind buffer retries them
+            for row in rows:
+                await gpt_response_log.submit(row)
+
+    return {
+        "results": results,
+        "unique_prompts": len(prompts),
+        "succeeded": len(rows),
+        "failed": len(results) - len(rows),
+    }
+
+
 # Supabase endpont for getting transactions
 @app.post("/api/transactions")
 async def filter_transactions(filters: TransactionFilter):
@@ -196,37 +424,89 @@ async def filter_transactions(filters: TransactionFilter):
         return {"error": str(e), "detail": "Something went wrong while filtering transactions"}
 
 
+@app.post("/api/transactions/summary")
+async def summarize_transactions(filters: TransactionFilter,
+                                 group_by: Optional[str] = QueryParam(None, pattern="^(city|product|sales_rep|sku)$"),
+                                 bucket: Optional[str] = QueryParam(None, pattern="^(day|week|month)$")):
+    """Totals for the filtered transactions, optionally grouped and bucketed by date."""
+    return await get_transaction_breakdown(supabase, filters, group_by, bucket)
+
+
+@app.post("/api/transactions/export")
+async def export_filtered_transactions(filters: TransactionFilter,
+                                       format: str = QueryParam("ndjson", pattern="^(ndjson|csv)$")):
+    """Stream the filtered transactions as NDJSON or CSV."""
+    return StreamingResponse(
+        export_transactions(supabase, format, filters),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f"attachment; filename=transactions.{format}"},
+    )
+
+
 @app.get("/api/unique-values")
 async def get_unique_values_endpoint():
     """Fetch all unique values for filtering from the transactions table."""
     return await get_unique_values(supabase)
 
+@app.get("/snapshot/status")
+async def get_snapshot_status():
+    """Freshness of the local table snapshot, if one is configured."""
+    return local_snapshot.status() if local_snapshot else {"enabled": False}
+
+@app.get("/api/unique-values/stats")
+async def get_unique_values_stats():
+    """Hit/miss counters for the distinct-value index."""
+    return unique_values_index.stats()
+
+@app.post("/api/unique-values/refresh")
+async def refresh_unique_values():
+    """Drop the cached distinct values so the next read rescans the table."""
+    unique_values_index.invalidate()
+    return {"message": "Unique values cache cleared"}
+
 #Get LAtest 20 transactions
 @app.get("/api/recent-transactions")
-async def get_recent_transactions_endpoint(limit: Optional[int] = 20):
-    """Fetch the most recent transactions, defaulting to 20."""
+async def get_recent_transactions_endpoint(limit: Optional[int] = 20,
+                                          count: str = QueryParam("cached", pattern="^(exact|planned|estimated|cached)$")):
+    """Fetch the most recent transactions, defaulting to 20.
+
+    `count` picks how total_count is computed: exact, planned, estimated or cached.
+    """
     if limit > 100:  # Add a reasonable upper limit
         raise HTTPException(status_code=400, detail="Limit cannot exceed 100 transactions")
-    return await get_recent_transactions(supabase, limit)
+    return await get_recent_transactions(supabase, limit, count)
 
 
-# Sales Forecast Fetch Function
-async def get_sales_forecast(supabase):
-    try:
-        response = supabase.table("sales_forecast").select("*").execute()
-        return response.data
-    except Exception as e:
-        raise RuntimeError(f"Error fetching sales forecast: {e}")
-
-# Endpoint
+# Sales Forecast
 @app.get("/api/salesforecast")
-async def get_sales_forecast_endpoint():
-    """Fetch all values from the sales forecast table."""
+async def get_sales_forecast_endpoint(
+    fields: Optional[str] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    sku: Optional[List[str]] = QueryParam(None),
+    limit: Optional[int] = QueryParam(None, ge=1, le=10000),
+    offset: int = QueryParam(0, ge=0),
+):
+    """Fetch sales forecast rows.
+
+    `fields=a,b` selects columns, `start_date`/`end_date` and repeated `sku`
+    filter rows, and `limit`/`offset` page through them. Without parameters
+    the whole table is returned, as before.
+    """
+    params = ForecastQuery(fields=parse_forecast_fields(fields), start_date=start_date, end_date=end_date,
+                           skus=sku, limit=limit, offset=offset)
     try:
-        data = await get_sales_forecast(supabase)
-        return {"success": True, "data": data}
+        data = await get_sales_forecast(supabase, params)
     except Exception as e:
-        return {"success": False, "error": str(e)}
+        return {"success": False, "error": f"Error fetching sales forecast: {e}"}
+    result = {"success": True, "data": data}
+    if limit:
+        result["next_offset"] = offset + limit if len(data) == limit else None
+    return result
+
+@app.get("/api/salesforecast/cache-stats")
+async def get_sales_forecast_cache_stats():
+    return forecast_cache.stats()
 
 
 
@@ -238,74 +518,106 @@ async def create_repo(repo_name: str, description: str = "", private: bool = Fal
         "description": description,
         "private": private
     }
-    response = requests.post(f"{GITHUB_API_URL}/user/repos", headers=headers, json=repo_data)
-    if response.status_code == 201:
-        return {"message": "Repository created successfully!", "data": response.json()}
-    else:
-        raise HTTPException(status_code=response.status_code, detail=response.json())
+    data = await github.create_repo(repo_data)
+    return {"message": "Repository created successfully!", "data": data}
 
 @app.get("/list-repos/")
 async def list_repos():
-    response = requests.get(f"{GITHUB_API_URL}/user/repos", headers=headers)
-    if response.status_code == 200:
-        repos = [repo["name"] for repo in response.json()]
-        return {"repositories": repos}
-    else:
-        raise HTTPException(status_code=response.status_code, detail=response.json())
+    repos = await github.list_repos()
+    return {"repositories": [repo["name"] for repo in repos]}
 
 @app.get("/fetch-trending-styles/")
 async def fetch_trending_styles():
-    url = "https://www.example.com/trending-hair-braiding-styles"  # Replace with a real URL
-    response = requests.get(url)
-    soup = BeautifulSoup(response.content, 'lxml')
-    styles = []
-    for item in soup.find_all('div', class_='style-item'):  # Adjust the class name as needed
-        style_name = item.find('h2').text.strip()
-        style_description = item.find('p').text.strip()
-        styles.append({"name": style_name, "description": style_description})
-    
-    # Insert styles into Supabase
-    for style in styles:
-        supabase.table('trending_styles').insert(style).execute()
-    
-    return {"trending_styles": styles}
+    """Scrape the configured style pages now and upsert any new styles."""
+    result = await style_scraper.run()
+    return {"trending_styles": result["styles"], **{k: v for k, v in result.items() if k != "styles"}}
+
+@app.get("/fetch-trending-styles/status")
+async def get_style_scraper_status():
+    return style_scraper.status()
 
 
 class Query(BaseModel):
     prompt: str
 
+ASK_SYSTEM_PROMPT = "You are a helpful coding assistant."
+
+def ask_messages(prompt: str):
+    return [
+        {"role": "system", "content": ASK_SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ]
+
+def openai_stream(prompt: str):
+    for chunk in client.chat.completions.create(model=MODEL, messages=ask_messages(prompt), stream=True):
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
 @app.post("/ask")
-async def ask(query: Query):
+async def ask(query: Query, http_request: Request, http_response: Response, stream: bool = False):
+    use_cache = not bypass_requested(http_request.headers)
+    cached = await llm_cache.get(query.prompt, MODEL, system=ASK_SYSTEM_PROMPT) if use_cache else None
+    http_response.headers["X-Cache"] = "HIT" if cached else "MISS"
+
+    if stream:
+        if cached:
+            return sse_response(cached_sse(cached), cache_status="HIT")
+
+        async def remember(text: str):
+            if text:
+                llm_cache.set(query.prompt, MODEL, text, system=ASK_SYSTEM_PROMPT)
+
+        return sse_response(stream_llm("openai", openai_stream, query.prompt), remember)
+
+    if cached:
+        return {"response": cached}
+
     # Use OpenAI to generate a response
-    completion = client.chat.completions.create(
+    completion = await run_llm(
+        "openai",
+        client.chat.completions.create,
         model=MODEL,  # Replace with your desired model, e.g., "gpt-4"
-        messages=[
-            {"role": "system", "content": "You are a helpful coding assistant."},
-            {"role": "user", "content": query.prompt}
-        ]
+        messages=ask_messages(query.prompt)
     )
     
     # Extract the response from the completion object
     response = completion.choices[0].message.content
+    if response:
+        llm_cache.set(query.prompt, MODEL, response, system=ASK_SYSTEM_PROMPT)
     
     return {"response": response}
 
 
+@app.get("/llm-cache/stats")
+async def get_llm_cache_stats():
+    """Hit-rate metrics for the LLM response cache."""
+    return llm_cache.stats()
+
+@app.get("/llm/stats")
+async def get_llm_pool_stats():
+    """In-flight, rejected and timed-out calls per LLM provider pool."""
+    return llm_stats()
+
+@app.get("/gpt-responses/log-stats")
+async def get_gpt_response_log_stats():
+    """Queue depth and flush latency of the gpt_responses write-behind buffer."""
+    return gpt_response_log.stats()
+
 
 @app.get("/github/repos")
 async def get_github_repos():
-    headers = {"Authorization": f"token {GITHUB_TOKEN}"}
-    response = requests.get("https://api.github.com/user/repos", headers=headers)
-    if response.status_code == 200:
-        repos = [repo["name"] for repo in response.json()]
-        return {"repos": repos}
-    else:
-        raise HTTPException(status_code=response.status_code, detail="Error fetching GitHub repos")
+    repos = await github.list_repos()
+    return {"repos": [repo["name"] for repo in repos]}
+
+@app.get("/github/stats")
+async def get_github_stats():
+    """Request, 304 and repo-list cache counters for the GitHub client."""
+    return github.stats()
 
 @app.post("/store_data")
 async def store_data(data: dict):
     # Store data in Supabase
-    response = supabase.table("your_table_name").insert(data).execute()
+    response = await db.execute(supabase.table("your_table_name").insert(data))
     if response:
         return {"message": "Data stored successfully"}
     else:
@@ -327,24 +639,9 @@ async def create_table(request: CreateTableRequest):
         );
         """
         
-        # Call the custom RPC function via Supabase REST API
-        headers = {
-            "apikey": SUPABASE_KEY,
-            "Authorization": f"Bearer {SUPABASE_KEY}",
-            "Content-Type": "application/json"
-        }
-        payload = {
-            "query": query
-        }
-        response = requests.post(
-            f"{SUPABASE_URL}/rest/v1/rpc/execute_sql",
-            headers=headers,
-            json=payload
-        )
-        
-        if response.status_code != 200:
-            raise HTTPException(status_code=response.status_code, detail=f"Error creating table: {response.text}")
-        
+        # Call the custom RPC function through the shared client and DB pool
+        await db.execute(supabase.rpc("execute_sql", {"query": query}))
+
         return {"message": f"Table '{request.table_name}' created successfully!"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,126 @@
+import asyncio
+import json
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import db
+
+
+class ProductCatalog:
+    """In-memory copy of the products table, indexed by id.
+
+    Rows are kept as tuples sharing one column tuple. When the table has an
+    `updated_at` column, refreshes after the first load only fetch rows
+    changed since the newest one seen. A full reload still runs every
+    `full_refresh_interval` seconds so deletions are picked up.
+    """
+
+    def __init__(self, supabase, table: str = "products", ttl: float = 300,
+                 full_refresh_interval: float = 3600, updated_column: str = "updated_at",
+                 page_size: int = 1000):
+        self.supabase = supabase
+        self.table = table
+        self.ttl = ttl
+        self.full_refresh_interval = full_refresh_interval
+        self.updated_column = updated_column
+        self.page_size = page_size
+        self.full_loads = 0
+        self.incremental_loads = 0
+        self._columns: Tuple[str, ...] = ()
+        self._rows: Dict[object, tuple] = {}
+        self._list_body: Optional[bytes] = None
+        self._checked_at = 0.0
+        self._full_loaded_at = 0.0
+        self._high_water = None
+        self._lock = asyncio.Lock()
+
+    async def _fetch_all(self, changed_since=None) -> List[dict]:
+        """All rows, or those updated at or after `changed_since`, paged in a stable order.
+
+        `gte` rather than `gt` so rows committed later with the high-water
+        timestamp are not missed; re-applying a row is harmless.
+        """
+        rows, start = [], 0
+        while True:
+            query = self.supabase.table(self.table).select("*")
+            if changed_since is not None:
+                query = query.gte(self.updated_column, changed_since).order(self.updated_column)
+            response = await db.execute(query.order("id").range(start, start + self.page_size - 1))
+            rows.extend(response.data)
+            if len(response.data) < self.page_size:
+                return rows
+            start += self.page_size
+
+    def _load(self, rows: List[dict], replace: bool):
+        columns = tuple(rows[0].keys()) if rows else self._columns
+        if replace:
+            self._rows = {}
+        elif columns != self._columns:
+            return False  # Schema changed, caller does a full reload
+        self._columns = columns
+        for row in rows:
+            self._rows[row["id"]] = tuple(row.get(column) for column in columns)
+            updated = row.get(self.updated_column)
+            if updated is not None and (self._high_water is None or updated > self._high_water):
+                self._high_water = updated
+        self._list_body = None
+        return True
+
+    async def _refresh(self):
+        now = time.monotonic()
+        incremental = (
+            self._full_loaded_at
+            and self._high_water is not None
+            and now - self._full_loaded_at < self.full_refresh_interval
+        )
+        if incremental:
+            rows = await self._fetch_all(changed_since=self._high_water)
+            self.incremental_loads += 1
+            if self._load(rows, replace=False):
+                self._checked_at = now
+                return
+        self._high_water = None
+        self._load(await self._fetch_all(), replace=True)
+        self.full_loads += 1
+        self._checked_at = self._full_loaded_at = now
+
+    async def _ensure_fresh(self):
+        if self._full_loaded_at and time.monotonic() - self._checked_at < self.ttl:
+            return
+        async with self._lock:
+            if self._full_loaded_at and time.monotonic() - self._checked_at < self.ttl:
+                return  # Refreshed by another request while we waited
+            await self._refresh()
+
+    def _as_dict(self, row: tuple) -> dict:
+        return dict(zip(self._columns, row))
+
+    async def list_body(self) -> bytes:
+        """The whole catalog as a JSON array, serialized once per refresh."""
+        await self._ensure_fresh()
+        if self._list_body is None:
+            self._list_body = json.dumps([self._as_dict(row) for row in self._rows.values()], default=str).encode()
+        return self._list_body
+
+    async def get(self, product_id) -> Optional[dict]:
+        await self._ensure_fresh()
+        row = self._rows.get(product_id)
+        return self._as_dict(row) if row is not None else None
+
+    async def get_many(self, product_ids: Iterable) -> List[dict]:
+        await self._ensure_fresh()
+        return [self._as_dict(self._rows[pid]) for pid in product_ids if pid in self._rows]
+
+    def invalidate(self):
+        self._checked_at = 0.0
+        self._full_loaded_at = 0.0
+
+    def stats(self) -> dict:
+        return {
+            "products": len(self._rows),
+            "columns": list(self._columns),
+            "full_loads": self.full_loads,
+            "incremental_loads": self.incremental_loads,
+            "high_water": self._high_water,
+            "ttl_seconds": self.ttl,
+        }
@@ -0,0 +1,58 @@
+"""Lazily created LLM / video provider clients.
+
+Each provider SDK is imported and its client built on first use, then shared
+for the life of the process. Importing this module is cheap, so app startup
+does not pay for SDKs (or credential files) a request may never need.
+"""
+import functools
+import os
+import threading
+
+
+def lazy(factory):
+    """Call `factory` once, on first use, and return the same object afterwards."""
+    lock = threading.Lock()
+    instance = []
+
+    @functools.wraps(factory)
+    def get():
+        if not instance:
+            with lock:
+                if not instance:
+                    instance.append(factory())
+        return instance[0]
+
+    get.initialized = lambda: bool(instance)
+    return get
+
+
+@lazy
+def get_gemini_model():
+    import google.generativeai as genai
+
+    genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+    return genai.GenerativeModel(os.getenv("GEMINI_MODEL", "gemini-2.0-flash-exp"))
+
+
+@lazy
+def get_vertex_client():
+    from google import genai
+    from google.oauth2 import service_account
+
+    creds = service_account.Credentials.from_service_account_file(
+        os.getenv("VERTEX_SERVICE_ACCOUNT_FILE", "path/to/your/service_account.json"),
+        scopes=["https://www.googleapis.com/auth/cloud-platform"],
+    )
+    return genai.Client(
+        vertexai=True,
+        project=os.getenv("VERTEX_PROJECT", "fintastic-godrej"),
+        location=os.getenv("VERTEX_LOCATION", "us-central1"),
+        credentials=creds,
+    )
+
+
+@lazy
+def get_text_embedder():
+    from sentence_transformers import SentenceTransformer
+
+    return SentenceTransformer(os.getenv("RECIPE_EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2"))
@@ -0,0 +1,299 @@
+"""Embedded vector index for recipe retrieval.
+
+Embeddings are L2-normalized float32 rows, so cosine similarity is a
+matrix-vector product. They are stored as an append-only log of segments:
+each add() writes one new `seg-N.npy` / `seg-N.json` pair (vectors and
+recipes) and then atomically replaces `manifest.json`, which is the commit
+point. Small tail segments are merged while they are comparable in size to
+the one before them, so every row is rewritten O(log n) times rather than on
+every add. Segments are memory-mapped on load.
+
+Large corpora can build an IVF index (k-means centroids plus one list
+assignment per row) to scan only the `nprobe` closest lists per query.
+"""
+import hashlib
+import json
+import os
+import threading
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+MANIFEST = "manifest.json"
+
+
+def recipe_text(recipe: dict) -> str:
+    """The text embedded for a recipe."""
+    ingredients = ", ".join(recipe.get("ingredients") or [])
+    return f"{recipe.get('name', '')}\n{recipe.get('description', '')}\nIngredients: {ingredients}\n{recipe.get('instructions', '')}"
+
+
+def recipe_hash(recipe: dict) -> str:
+    return hashlib.sha256(recipe_text(recipe).encode()).hexdigest()
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors[None, :]
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+def _replace_file(path: str, write):
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        write(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    if k >= len(scores):
+        return np.argsort(-scores)
+    top = np.argpartition(-scores, k)[:k]
+    return top[np.argsort(-scores[top])]
+
+
+class _Segment:
+    def __init__(self, name: str, vectors: np.ndarray, recipes: List[dict]):
+        self.name = name
+        self.vectors = vectors
+        self.recipes = recipes
+
+    def __len__(self):
+        return len(self.recipes)
+
+
+class RecipeIndex:
+    """Recipes plus their normalized embeddings, with exact or IVF top-k search.
+
+    Writers hold `lock`; readers work on the segment list current when they
+    started, which writers replace rather than mutate.
+    """
+
+    def __init__(self, path: str, dim: int = 384, ivf_min_size: int = 20000, nprobe: int = 8):
+        self.path = path
+        self.dim = dim
+        self.ivf_min_size = ivf_min_size
+        self.nprobe = nprobe
+        self.recipes: List[dict] = []
+        self.centroids: Optional[np.ndarray] = None
+        self.lock = threading.RLock()
+        self._segments: List[_Segment] = []
+        self._assign: Optional[np.ndarray] = None
+        self._lists: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        self._ivf_files: Optional[dict] = None
+        self._next_id = 1
+        self._hashes = set()
+        os.makedirs(path, exist_ok=True)
+        self.load()
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def __len__(self):
+        return len(self.recipes)
+
+    # Persistence ----------------------------------------------------------
+
+    def _write_segment(self, vectors: np.ndarray, recipes: List[dict]) -> _Segment:
+        name = f"seg-{self._next_id:06d}"
+        self._next_id += 1
+        _replace_file(self._file(name + ".npy"), lambda f: np.save(f, vectors))
+        _replace_file(self._file(name + ".json"), lambda f: f.write(json.dumps(recipes).encode()))
+        return _Segment(name, np.load(self._file(name + ".npy"), mmap_mode="r"), recipes)
+
+    def _write_manifest(self, segments: List[_Segment], ivf: Optional[dict]):
+        manifest = {
+            "dim": self.dim,
+            "next_id": self._next_id,
+            "segments": [{"name": segment.name, "rows": len(segment)} for segment in segments],
+            "ivf": ivf,
+        }
+        _replace_file(self._file(MANIFEST), lambda f: f.write(json.dumps(manifest).encode()))
+
+    def _remove_unreferenced(self):
+        live = {segment.name for segment in self._segments}
+        if self._ivf_files:
+            live.update(os.path.splitext(name)[0] for name in self._ivf_files.values() if isinstance(name, str))
+        for filename in os.listdir(self.path):
+            stem, ext = os.path.splitext(filename)
+            if filename.startswith(("seg-", "ivf-")) and (ext == ".tmp" or stem not in live):
+                os.remove(self._file(filename))
+
+    def load(self):
+        """Load the committed segments, checking each one's vectors and recipes agree."""
+        if not os.path.exists(self._file(MANIFEST)):
+            return
+        with open(self._file(MANIFEST)) as f:
+            manifest = json.load(f)
+        segments = []
+        for entry in manifest["segments"]:
+            vectors = np.load(self._file(entry["name"] + ".npy"), mmap_mode="r")
+            with open(self._file(entry["name"] + ".json")) as f:
+                recipes = json.load(f)
+            if not (len(vectors) == len(recipes) == entry["rows"]) or vectors.shape[1] != manifest["dim"]:
+                raise ValueError(f"Recipe index segment {entry['name']} is inconsistent: "
+                                 f"{len(vectors)} vectors, {len(recipes)} recipes, manifest says {entry['rows']}")
+            segments.append(_Segment(entry["name"], vectors, recipes))
+
+        with self.lock:
+            self.dim = manifest["dim"]
+            self._next_id = manifest["next_id"]
+            self._segments = segments
+            self.recipes = [recipe for segment in segments for recipe in segment.recipes]
+            self._hashes = {recipe.get("content_hash") or recipe_hash(recipe) for recipe in self.recipes}
+            self.centroids, self._assign, self._lists, self._ivf_files = None, None, None, None
+            ivf = manifest.get("ivf")
+            if ivf and ivf["rows"] <= len(self.recipes):
+                self._ivf_files = ivf
+                self.centroids = np.load(self._file(ivf["centroids"]))
+                assign = np.load(self._file(ivf["assign"]))
+                # Rows added after the IVF build are assigned to their nearest list now
+                rest = self._concat(ivf["rows"])
+                self._assign = np.concatenate([assign, self._nearest_list(rest)]) if len(rest) else assign
+            self._remove_unreferenced()
+
+    # Writes ---------------------------------------------------------------
+
+    def contains(self, content_hash: str) -> bool:
+        return content_hash in self._hashes
+
+    def _nearest_list(self, vectors: np.ndarray) -> np.ndarray:
+        return np.argmax(vectors @ self.centroids.T, axis=1).astype(np.int32)
+
+    def _merge_tail(self, segments: List[_Segment]) -> List[_Segment]:
+        """Merge the last two segments while the older one is at most twice the newer one's size."""
+        while len(segments) >= 2 and len(segments[-2]) <= 2 * len(segments[-1]):
+            older, newer = segments[-2], segments[-1]
+            merged = self._write_segment(np.concatenate([older.vectors, newer.vectors]),
+                                         older.recipes + newer.recipes)
+            segments = segments[:-2] + [merged]
+        return segments
+
+    def add(self, vectors: np.ndarray, recipes: Sequence[dict]) -> List[int]:
+        """Append and persist recipes with their embeddings; returns their row ids.
+
+        Each recipe is stored with its `content_hash`. Callers skip recipes the
+        index already contains(), holding `lock` across the check and the add.
+        """
+        recipes = [{**recipe, "content_hash": recipe.get("content_hash") or recipe_hash(recipe)} for recipe in recipes]
+        vectors = _normalize(vectors)
+        if len(vectors) != len(recipes):
+            raise ValueError("Need exactly one embedding per recipe")
+        if vectors.shape[1] != self.dim:
+            raise ValueError(f"Expected {self.dim}-dimensional embeddings, got {vectors.shape[1]}")
+        if not len(recipes):
+            return []
+        with self.lock:
+            segments = self._merge_tail(self._segments + [self._write_segment(vectors, recipes)])
+            self._write_manifest(segments, self._ivf_files)
+            start = len(self.recipes)
+            self._segments = segments
+            self.recipes = self.recipes + recipes
+            self._hashes.update(recipe["content_hash"] for recipe in recipes)
+            if self.centroids is not None:
+                self._assign = np.concatenate([self._assign, self._nearest_list(vectors)])
+                self._lists = None
+            self._remove_unreferenced()
+        return list(range(start, start + len(recipes)))
+
+    def add_new(self, vectors: np.ndarray, recipes: Sequence[dict]) -> List[int]:
+        """add() only the recipes whose content hash is not indexed yet, checked under `lock`."""
+        hashes = [recipe.get("content_hash") or recipe_hash(recipe) for recipe in recipes]
+        with self.lock:
+            keep = [row for row, content_hash in enumerate(hashes) if content_hash not in self._hashes]
+            return self.add(np.asarray(vectors)[keep], [recipes[row] for row in keep])
+
+    def _concat(self, start: int = 0) -> np.ndarray:
+        """Rows from `start` on as one in-memory array."""
+        parts, offset = [], 0
+        for segment in self._segments:
+            if offset + len(segment) > start:
+                parts.append(segment.vectors[max(start - offset, 0):])
+            offset += len(segment)
+        return np.concatenate(parts) if parts else np.empty((0, self.dim), dtype=np.float32)
+
+    def build_ivf(self, nlist: Optional[int] = None, iterations: int = 10, seed: int = 0):
+        """Cluster rows with spherical k-means into `nlist` inverted lists (default ~sqrt(n)) and persist them."""
+        with self.lock:
+            matrix = self._concat()
+            if not len(matrix):
+                return
+            nlist = min(nlist or max(1, int(np.sqrt(len(matrix)))), len(matrix))
+            rng = np.random.default_rng(seed)
+            centroids = matrix[rng.choice(len(matrix), nlist, replace=False)].copy()
+            for _ in range(iterations):
+                assign = np.argmax(matrix @ centroids.T, axis=1)
+                sums = np.zeros_like(centroids)
+                np.add.at(sums, assign, matrix)
+                empty = np.bincount(assign, minlength=nlist) == 0
+                sums[empty] = centroids[empty]  # Keep centroids that lost all their rows
+                centroids = _normalize(sums)
+            assign = np.argmax(matrix @ centroids.T, axis=1).astype(np.int32)
+
+            name = f"ivf-{self._next_id:06d}"
+            self._next_id += 1
+            ivf = {"centroids": name + "-centroids.npy", "assign": name + "-assign.npy", "rows": len(matrix)}
+            _replace_file(self._file(ivf["centroids"]), lambda f: np.save(f, centroids))
+            _replace_file(self._file(ivf["assign"]), lambda f: np.save(f, assign))
+            self._write_manifest(self._segments, ivf)
+            self.centroids, self._assign, self._lists, self._ivf_files = centroids, assign, None, ivf
+            self._remove_unreferenced()
+
+    # Reads ----------------------------------------------------------------
+
+    def _inverted_lists(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Row ids grouped by list, and the offset where each list starts."""
+        lists = self._lists
+        if lists is None:
+            assign = self._assign
+            order = np.argsort(assign, kind="stable")
+            offsets = np.searchsorted(assign[order], np.arange(len(self.centroids) + 1))
+            lists = self._lists = (order, offsets)
+        return lists
+
+    def search(self, query: np.ndarray, k: int = 4) -> List[Tuple[float, dict]]:
+        """Top-k (cosine score, recipe) pairs for a query embedding."""
+        segments = self._segments
+        rows_total = sum(len(segment) for segment in segments)
+        if not rows_total:
+            return []
+        query = _normalize(query)[0]
+        candidates = None
+        if self.centroids is not None and rows_total >= self.ivf_min_size:
+            probe = _top_k(self.centroids @ query, self.nprobe)
+            order, offsets = self._inverted_lists()
+            candidates = np.sort(np.concatenate([order[offsets[l]:offsets[l + 1]] for l in probe]))
+            candidates = candidates[candidates < rows_total]
+            if len(candidates) < k:
+                candidates = None
+
+        if candidates is None:
+            scores = np.concatenate([segment.vectors @ query for segment in segments])
+            rows = _top_k(scores, k)
+            row_scores = scores[rows]
+        else:
+            parts, start = [], 0
+            for segment in segments:
+                lo, hi = np.searchsorted(candidates, [start, start + len(segment)])
+                if hi > lo:
+                    parts.append(segment.vectors[candidates[lo:hi] - start] @ query)
+                start += len(segment)
+            scores = np.concatenate(parts)
+            top = _top_k(scores, k)
+            rows, row_scores = candidates[top], scores[top]
+        return [(float(score), self.recipes[row]) for row, score in zip(rows, row_scores)]
+
+    def stats(self) -> dict:
+        return {
+            "recipes": len(self.recipes),
+            "dim": self.dim,
+            "segments": len(self._segments),
+            "ivf_lists": len(self.centroids) if self.centroids is not None else 0,
+            "ivf_active": self.centroids is not None and len(self.recipes) >= self.ivf_min_size,
+            "nprobe": self.nprobe,
+            "path": self.path,
+        }
@@ -0,0 +1,283 @@
+import asyncio
+import json
+import os
+import time
+from typing import TYPE_CHECKING, Callable, List, Optional
+
+from fastapi import APIRouter, HTTPException, Request, Response
+from pydantic import BaseModel, Field, ValidationError
+
+from llm_executor import run_llm
+from providers import get_gemini_model, get_text_embedder, lazy
+
+if TYPE_CHECKING:
+    # numpy-backed; imported on first use so importing the app stays cheap
+    import numpy as np
+    from recipe_index import RecipeIndex
+    from semantic_cache import SemanticCache
+
+router = APIRouter()
+
+# RECIPE_ANSWER_WITH_LLM=false answers /query-recipes/ from the index alone, fully offline
+ANSWER_WITH_LLM = os.getenv("RECIPE_ANSWER_WITH_LLM", "true").lower() == "true"
+
+
+class Recipe(BaseModel):
+    name: str
+    description: str
+    ingredients: List[str]
+    instructions: str
+
+class RecipeQuery(BaseModel):
+    query: str
+    k: int = Field(4, ge=1, le=50)
+
+
+@lazy
+def get_recipe_index() -> "RecipeIndex":
+    from recipe_index import RecipeIndex
+
+    return RecipeIndex(
+        os.getenv("RECIPE_INDEX_DIR", "recipe_index"),
+        ivf_min_size=int(os.getenv("RECIPE_IVF_MIN_SIZE", "20000")),
+        nprobe=int(os.getenv("RECIPE_IVF_NPROBE", "8")),
+    )
+
+
+@lazy
+def get_semantic_cache() -> "SemanticCache":
+    """Answers to earlier /query-recipes/ questions, matched by query embedding."""
+    from semantic_cache import SemanticCache
+
+    return SemanticCache(
+        dim=get_recipe_index().dim,
+        maxsize=int(os.getenv("RECIPE_SEMANTIC_CACHE_SIZE", "1024")),
+        threshold=float(os.getenv("RECIPE_SEMANTIC_CACHE_THRESHOLD", "0.92")),
+    )
+
+
+def embed_texts(texts: List[str]) -> "np.ndarray":
+    return get_text_embedder().encode(texts, batch_size=max(len(texts), 1), normalize_embeddings=True,
+                                      convert_to_numpy=True)
+
+
+class RecipeIngestor:
+    """Adds validated recipes to the index in embedding batches.
+
+    Recipes whose content hash is already indexed (or repeated in the same
+    request) are skipped; the index re-checks hashes under its lock when each
+    batch is added, so concurrent requests cannot add the same recipe twice.
+    The next batch is embedded while the previous one is being added.
+    `on_added` is called after a request that added anything.
+    """
+
+    def __init__(self, embed, batch_size: int = 64, on_added: Optional[Callable[[], None]] = None):
+        self.embed = embed
+        self.batch_size = batch_size
+        self.on_added = on_added
+        self.received = 0
+        self.added = 0
+        self.skipped = 0
+        self.batches = 0
+        self.embed_seconds = 0.0
+        self.last_recipes_per_sec = 0.0
+
+    def _embed(self, batch: List[dict]) -> "np.ndarray":
+        from recipe_index import recipe_text
+
+        start = time.perf_counter()
+        vectors = self.embed([recipe_text(recipe) for recipe in batch])
+        self.embed_seconds += time.perf_counter() - start
+        return vectors
+
+    async def ingest(self, index: "RecipeIndex", recipes: List[dict]) -> dict:
+        from recipe_index import recipe_hash
+
+        start = time.perf_counter()
+        received = added = skipped = 0
+        seen = set()
+        batch: List[dict] = []
+        batches: List[List[dict]] = []
+        for recipe in recipes:
+            received += 1
+            content_hash = recipe_hash(recipe)
+            if content_hash in seen or index.contains(content_hash):
+                skipped += 1
+                continue
+            seen.add(content_hash)
+            batch.append({**recipe, "content_hash": content_hash})
+            if len(batch) >= self.batch_size:
+                batches.append(batch)
+                batch = []
+        if batch:
+            batches.append(batch)
+
+        next_embedding = None
+        try:
+            for position, pending in enumerate(batches):
+                vectors = await (next_embedding or asyncio.to_thread(self._embed, pending))
+                next_embedding = None
+                if position + 1 < len(batches):
+                    next_embedding = asyncio.create_task(asyncio.to_thread(self._embed, batches[position + 1]))
+                rows = await asyncio.to_thread(index.add_new, vectors, pending)
+                added += len(rows)
+                skipped += len(pending) - len(rows)
+                self.batches += 1
+        finally:
+            if next_embedding and not next_embedding.done():
+                next_embedding.cancel()
+            if added and self.on_added:
+                self.on_added()
+            elapsed = time.perf_counter() - start
+            self.received += received
+            self.added += added
+            self.skipped += skipped
+            self.last_recipes_per_sec = received / elapsed if elapsed else 0.0
+
+        return {
+            "received": received,
+            "added": added,
+            "skipped": skipped,
+            "seconds": round(elapsed, 3),
+            "recipes_per_sec": round(self.last_recipes_per_sec, 1),
+            "recipes": len(index),
+        }
+
+    def stats(self) -> dict:
+        return {
+            "received": self.received,
+            "added": self.added,
+            "skipped": self.skipped,
+            "batches": self.batches,
+            "batch_size": self.batch_size,
+            "embedded_per_sec": round(self.added / self.embed_seconds, 1) if self.embed_seconds else 0.0,
+            "last_recipes_per_sec": round(self.last_recipes_per_sec, 1),
+        }
+
+
+recipe_ingestor = RecipeIngestor(
+    embed_texts,
+    batch_size=int(os.getenv("RECIPE_EMBED_BATCH_SIZE", "64")),
+    on_added=lambda: get_semantic_cache().clear(),  # Cached answers predate the new recipes
+)
+
+
+def validate_recipe(data, position: int) -> dict:
+    try:
+        return Recipe(**data).dict()
+    except (TypeError, ValidationError) as e:
+        detail = e.errors() if isinstance(e, ValidationError) else str(e)
+        raise HTTPException(status_code=422, detail={"recipe": position, "errors": detail})
+
+
+def validate_recipes(items: list) -> List[dict]:
+    return [validate_recipe(item, position) for position, item in enumerate(items)]
+
+
+async def ndjson_recipes(request: Request) -> List[dict]:
+    """Recipes from an NDJSON body, parsed as the chunks arrive and all validated before any is indexed."""
+    recipes = []
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                recipes.append(validate_recipe(_json_line(line, len(recipes)), len(recipes)))
+    if buffer.strip():
+        recipes.append(validate_recipe(_json_line(buffer, len(recipes)), len(recipes)))
+    return recipes
+
+
+def _json_line(line: bytes, position: int):
+    try:
+        return json.loads(line)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid JSON on recipe {position}: {e}")
+
+
+def answer_prompt(query: str, recipes: List[dict]) -> str:
+    from recipe_index import recipe_text
+
+    context = "\n\n".join(recipe_text(recipe) for recipe in recipes)
+    return f"Use these recipes to answer the question.\n\n{context}\n\nQuestion: {query}"
+
+
+@router.post("/add-recipe/")
+async def add_recipe(recipe: Recipe):
+    """Embed a recipe and add it to the local index, unless it is already there."""
+    result = await recipe_ingestor.ingest(get_recipe_index(), [recipe.dict()])
+    if not result["added"]:
+        return {"message": f"Recipe '{recipe.name}' is already indexed.", "recipes": result["recipes"]}
+    return {"message": f"Recipe '{recipe.name}' added.", "recipes": result["recipes"]}
+
+@router.post("/add-recipes/")
+async def add_recipes(request: Request):
+    """Bulk-add recipes from a JSON array, or from NDJSON with Content-Type application/x-ndjson.
+
+    The whole body is validated first, so a bad recipe rejects the request with nothing indexed.
+    """
+    if "ndjson" in request.headers.get("content-type", ""):
+        recipes = await ndjson_recipes(request)
+    else:
+        try:
+            items = await request.json()
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Body must be a JSON array of recipes")
+        if not isinstance(items, list):
+            raise HTTPException(status_code=400, detail="Body must be a JSON array of recipes")
+        recipes = validate_recipes(items)
+    return await recipe_ingestor.ingest(get_recipe_index(), recipes)
+
+@router.post("/query-recipes/")
+async def query_recipes(query: RecipeQuery, http_response: Response):
+    """Answer a question from the closest recipes in the local index.
+
+    Questions close enough to an earlier one (see /recipes/semantic-cache/stats)
+    get the earlier answer without retrieval or an LLM call.
+    """
+    index = get_recipe_index()
+    vector = (await asyncio.to_thread(embed_texts, [query.query]))[0]
+    semantic_cache = get_semantic_cache()
+    cached, similarity = semantic_cache.get(vector, scope=query.k)
+    http_response.headers["X-Cache"] = "HIT" if cached else "MISS"
+    http_response.headers["X-Cache-Similarity"] = f"{similarity:.4f}"
+    if cached:
+        return cached
+
+    results = index.search(vector, query.k)
+    if not results:
+        raise HTTPException(status_code=404, detail="No recipes indexed yet.")
+
+    matches = [{**recipe, "score": round(score, 4)} for score, recipe in results]
+    if ANSWER_WITH_LLM:
+        response = await run_llm("gemini", get_gemini_model().generate_content,
+                                 answer_prompt(query.query, [recipe for _, recipe in results]))
+        answer = response.text
+    else:
+        from recipe_index import recipe_text
+
+        answer = "\n\n".join(recipe_text(recipe) for _, recipe in results)
+    result = {"response": answer, "matches": matches}
+    semantic_cache.set(vector, result, scope=query.k)
+    return result
+
+@router.get("/recipes/semantic-cache/stats")
+async def get_semantic_cache_stats():
+    return get_semantic_cache().stats()
+
+@router.post("/recipes/semantic-cache/clear")
+async def clear_semantic_cache():
+    get_semantic_cache().clear()
+    return {"message": "Semantic cache cleared"}
+
+@router.get("/recipes/index/stats")
+async def get_recipe_index_stats():
+    return {**get_recipe_index().stats(), "ingest": recipe_ingestor.stats()}
+
+@router.post("/recipes/index/build-ivf")
+async def build_recipe_ivf(nlist: int = 0):
+    """Cluster the index for faster search on large corpora (nlist=0 picks ~sqrt(n))."""
+    index = get_recipe_index()
+    await asyncio.to_thread(index.build_ivf, nlist or None)
+    return index.stats()
@@ -0,0 +1,69 @@
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+class SemanticCache:
+    """LRU cache of answers looked up by embedding similarity instead of exact text.
+
+    Query embeddings live in one preallocated (maxsize, dim) matrix, so a
+    lookup is a single matrix-vector product. A lookup hits when the most
+    similar stored query in the same `scope` scores at least `threshold`
+    (cosine similarity; embeddings are expected to be normalized).
+    """
+
+    def __init__(self, dim: int = 384, maxsize: int = 1024, threshold: float = 0.92):
+        if maxsize < 1:
+            raise ValueError("SemanticCache maxsize must be at least 1")
+        self.dim = dim
+        self.maxsize = maxsize
+        self.threshold = threshold
+        self.hits = 0
+        self.misses = 0
+        self._vectors = np.zeros((maxsize, dim), dtype=np.float32)
+        self._scopes = np.full(maxsize, -1, dtype=np.int64)  # -1 marks a free slot
+        self._values = [None] * maxsize
+        self._lru: "OrderedDict[int, None]" = OrderedDict()  # Slots, least recently used first
+
+    def get(self, vector: np.ndarray, scope: int = 0) -> Tuple[Optional[object], float]:
+        """(value, similarity) of the closest stored query, value None below the threshold."""
+        scores = self._vectors @ np.asarray(vector, dtype=np.float32).reshape(-1)
+        scores[self._scopes != scope] = -np.inf
+        slot = int(np.argmax(scores))
+        score = float(scores[slot])
+        if score >= self.threshold:
+            self.hits += 1
+            self._lru.move_to_end(slot)
+            return self._values[slot], score
+        self.misses += 1
+        return None, score if np.isfinite(score) else 0.0
+
+    def set(self, vector: np.ndarray, value, scope: int = 0):
+        if len(self._lru) < self.maxsize:
+            slot = len(self._lru)
+        else:
+            slot, _ = self._lru.popitem(last=False)
+        self._vectors[slot] = np.asarray(vector, dtype=np.float32).reshape(-1)
+        self._scopes[slot] = scope
+        self._values[slot] = value
+        self._lru[slot] = None
+
+    def clear(self):
+        self._scopes[:] = -1
+        self._values = [None] * self.maxsize
+        self._lru.clear()
+
+    def __len__(self):
+        return len(self._lru)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "size": len(self._lru),
+            "maxsize": self.maxsize,
+            "threshold": self.threshold,
+        }
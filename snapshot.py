@@ -0,0 +1,225 @@
+"""Optional local SQLite copy of Supabase tables for read-heavy analytics.
+
+Each table is synced by pulling rows whose key is above the highest key
+already stored (delta sync), so the key must only ever increase (e.g. an
+identity `id`). Reads are served locally only while the last successful
+sync is within `max_staleness` seconds; otherwise callers fall back to
+Supabase.
+
+Syncs write through one connection under a lock; each reader thread gets
+its own query-only connection, so WAL lets reads run alongside a sync.
+Columns that held JSON objects or arrays are recorded and decoded on read.
+"""
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Set
+
+import db
+
+logger = logging.getLogger(__name__)
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _to_sqlite(value):
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return value
+
+
+def _from_sqlite(value):
+    if isinstance(value, str) and value[:1] in ("{", "["):
+        try:
+            return json.loads(value)
+        except ValueError:
+            pass
+    return value
+
+
+class LocalSnapshot:
+    def __init__(self, supabase, path: str, tables: Dict[str, str], sync_interval: float = 60,
+                 max_staleness: float = 300, page_size: int = 1000):
+        self.supabase = supabase
+        self.path = path
+        self.tables = tables  # table name -> monotonically increasing key column
+        self.sync_interval = sync_interval
+        self.max_staleness = max_staleness
+        self.page_size = page_size
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA mmap_size=268435456")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS _json_columns (table_name TEXT, column_name TEXT, "
+                           "PRIMARY KEY (table_name, column_name))")
+        self._lock = threading.Lock()  # Serializes writes; readers use _readers
+        self._readers = threading.local()
+        self._columns: Dict[str, List[str]] = {}
+        self._json_columns: Dict[str, Set[str]] = {table: set() for table in tables}
+        self._synced_at: Dict[str, float] = {}
+        self._last_error: Dict[str, Optional[str]] = {}
+        self._task: Optional[asyncio.Task] = None
+        for table in tables:
+            self._columns[table] = [row[1] for row in self._conn.execute(f"PRAGMA table_info({_quote(table)})")]
+        for table, column in self._conn.execute("SELECT table_name, column_name FROM _json_columns"):
+            self._json_columns.setdefault(table, set()).add(column)
+        self._decoded = set().union(*self._json_columns.values())
+
+    # Writes ---------------------------------------------------------------
+
+    def _ensure_columns(self, table: str, columns: List[str]):
+        key = self.tables[table]
+        known = self._columns[table]
+        if not known:
+            cols = ", ".join(_quote(c) + (" PRIMARY KEY" if c == key else "") for c in columns)
+            self._conn.execute(f"CREATE TABLE IF NOT EXISTS {_quote(table)} ({cols})")
+            known.extend(columns)
+            return
+        for column in columns:
+            if column not in known:
+                self._conn.execute(f"ALTER TABLE {_quote(table)} ADD COLUMN {_quote(column)}")
+                known.append(column)
+
+    def _record_json_columns(self, table: str, columns: List[str], rows: List[dict]):
+        known = self._json_columns[table]
+        new = [c for c in columns if c not in known and any(isinstance(row.get(c), (dict, list)) for row in rows)]
+        if new:
+            self._conn.executemany("INSERT OR IGNORE INTO _json_columns VALUES (?, ?)", [(table, c) for c in new])
+            known.update(new)
+            self._decoded = self._decoded | set(new)
+
+    def _write(self, table: str, rows: List[dict]):
+        columns = list(rows[0].keys())
+        with self._lock:
+            self._ensure_columns(table, columns)
+            self._record_json_columns(table, columns, rows)
+            placeholders = ", ".join("?" for _ in columns)
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO {_quote(table)} ({', '.join(map(_quote, columns))}) VALUES ({placeholders})",
+                [tuple(_to_sqlite(row.get(c)) for c in columns) for row in rows],
+            )
+            self._conn.commit()
+
+    def _max_key(self, table: str):
+        if not self._columns[table]:
+            return None
+        row = self._reader().execute(f"SELECT MAX({_quote(self.tables[table])}) FROM {_quote(table)}").fetchone()
+        return row[0]
+
+    async def sync(self, table: str) -> int:
+        """Pull rows newer than the local high-water key; returns how many were added."""
+        key = self.tables[table]
+        added = 0
+        try:
+            last_key = await asyncio.to_thread(self._max_key, table)
+            while True:
+                query = self.supabase.table(table).select("*").order(key).limit(self.page_size)
+                if last_key is not None:
+                    query = query.gt(key, last_key)
+                rows = (await db.execute(query)).data
+                if rows:
+                    await asyncio.to_thread(self._write, table, rows)
+                    added += len(rows)
+                    last_key = rows[-1][key]
+                if len(rows) < self.page_size:
+                    break
+        except Exception as e:
+            self._last_error[table] = str(e)
+            raise
+        self._synced_at[table] = time.time()
+        self._last_error[table] = None
+        return added
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self):
+        while True:
+            for table in self.tables:
+                try:
+                    await self.sync(table)
+                except Exception as e:
+                    logger.warning("Snapshot sync of %s failed: %s", table, e)
+            await asyncio.sleep(self.sync_interval)
+
+    # Reads ----------------------------------------------------------------
+
+    def is_fresh(self, table: str) -> bool:
+        synced_at = self._synced_at.get(table)
+        return synced_at is not None and time.time() - synced_at <= self.max_staleness
+
+    def _reader(self) -> sqlite3.Connection:
+        conn = getattr(self._readers, "conn", None)
+        if conn is None:
+            conn = self._readers.conn = sqlite3.connect(self.path)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA query_only=ON")
+            conn.execute("PRAGMA mmap_size=268435456")
+        return conn
+
+    def _query(self, sql: str, params) -> List[dict]:
+        decoded = self._decoded
+        return [
+            {column: _from_sqlite(value) if column in decoded else value for column, value in dict(row).items()}
+            for row in self._reader().execute(sql, params).fetchall()
+        ]
+
+    async def query(self, sql: str, params=()) -> List[dict]:
+        return await asyncio.to_thread(self._query, sql, params)
+
+    def status(self) -> dict:
+        return {
+            "path": self.path,
+            "max_staleness_seconds": self.max_staleness,
+            "sync_interval_seconds": self.sync_interval,
+            "tables": {
+                table: {
+                    "key": key,
+                    "fresh": self.is_fresh(table),
+                    "age_seconds": round(time.time() - self._synced_at[table], 1) if table in self._synced_at else None,
+                    "last_error": self._last_error.get(table),
+                }
+                for table, key in self.tables.items()
+            },
+        }
+
+
+local_snapshot: Optional[LocalSnapshot] = None
+
+
+def fresh_snapshot(table: str) -> Optional[LocalSnapshot]:
+    """The configured snapshot if `table` is fresh enough to serve reads, else None."""
+    if local_snapshot is not None and local_snapshot.is_fresh(table):
+        return local_snapshot
+    return None
+
+
+def configure_snapshot(supabase) -> Optional[LocalSnapshot]:
+    """Enable the snapshot when SNAPSHOT_PATH is set."""
+    global local_snapshot
+    path = os.getenv("SNAPSHOT_PATH")
+    if path and local_snapshot is None:
+        local_snapshot = LocalSnapshot(
+            supabase,
+            path,
+            {
+                "transactions": os.getenv("SNAPSHOT_TRANSACTIONS_KEY", "id"),
+                "sales_forecast": os.getenv("SNAPSHOT_FORECAST_KEY", "id"),
+            },
+            sync_interval=float(os.getenv("SNAPSHOT_SYNC_INTERVAL", "60")),
+            max_staleness=float(os.getenv("SNAPSHOT_MAX_STALENESS", "300")),
+        )
+    return local_snapshot
@@ -0,0 +1,30 @@
+-- Summary for POST /api/transactions with aggregate=true.
+-- NULL parameters mean "no filter", matching TransactionFilter.
+create or replace function get_transaction_summary(
+    p_start_date date default null,
+    p_end_date date default null,
+    p_city text default null,
+    p_product text default null,
+    p_sales_rep text default null
+)
+returns table (
+    total_sales numeric,
+    avg_price numeric,
+    total_quantity bigint,
+    transaction_count bigint
+)
+language sql
+stable
+as $$
+    select
+        coalesce(sum(total), 0)::numeric,
+        coalesce(avg(price), 0)::numeric,
+        coalesce(sum(quantity), 0)::bigint,
+        count(*)::bigint
+    from transactions
+    where (p_start_date is null or date >= p_start_date)
+      and (p_end_date is null or date <= p_end_date)
+      and (p_city is null or city = p_city)
+      and (p_product is null or product = p_product)
+      and (p_sales_rep is null or sales_rep = p_sales_rep);
+$$;
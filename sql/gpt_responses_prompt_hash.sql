@@ -0,0 +1,11 @@
+-- Lookup key for the persistent LLM cache (llm_cache.PromptCache with LLM_CACHE_PERSISTENT=1).
+-- Run before enabling LLM_CACHE_PERSISTENT: only then do inserted gpt_responses rows carry prompt_hash.
+-- prompt_hash is sha256 of the whitespace-normalized prompt, matching the in-memory cache key.
+alter table gpt_responses add column if not exists prompt_hash text;
+
+update gpt_responses
+set prompt_hash = encode(sha256(convert_to(btrim(regexp_replace(prompt, '\s+', ' ', 'g')), 'UTF8')), 'hex')
+where prompt_hash is null and prompt is not null;
+
+create index if not exists gpt_responses_prompt_hash_idx
+    on gpt_responses (prompt_hash, model_name, created_at desc);
@@ -0,0 +1,17 @@
+-- Dedup key for GET /fetch-trending-styles/ (style_scraper.StyleScraper).
+-- The scraper upserts on content_hash, which needs a unique constraint.
+alter table trending_styles add column if not exists content_hash text;
+alter table trending_styles add column if not exists source_url text;
+
+-- Drop rows inserted repeatedly by the old per-row scraper before adding the constraint
+update trending_styles
+set content_hash = encode(sha256(convert_to(name || chr(10) || coalesce(description, ''), 'UTF8')), 'hex')
+where content_hash is null;
+
+delete from trending_styles a
+using trending_styles b
+where a.content_hash = b.content_hash
+  and a.ctid > b.ctid;
+
+create unique index if not exists trending_styles_content_hash_key
+    on trending_styles (content_hash);
@@ -0,0 +1,168 @@
+import asyncio
+import hashlib
+import logging
+import time
+from typing import Dict, List, Optional
+
+import httpx
+from lxml import html as lxml_html
+
+import db
+
+logger = logging.getLogger(__name__)
+
+STYLE_ITEM_XPATH = "//div[contains(concat(' ', normalize-space(@class), ' '), ' style-item ')]"
+
+
+def content_hash(name: str, description: str) -> str:
+    return hashlib.sha256(f"{name}\n{description}".encode()).hexdigest()
+
+
+def parse_styles(content: bytes, source_url: Optional[str] = None) -> List[dict]:
+    """Extract {name, description} from each div.style-item, skipping items without a heading."""
+    if not content.strip():
+        return []
+    styles = []
+    for item in lxml_html.fromstring(content).xpath(STYLE_ITEM_XPATH):
+        name = item.xpath("string(.//h2[1])").strip()
+        if not name:
+            continue
+        description = item.xpath("string(.//p[1])").strip()
+        styles.append({
+            "name": name,
+            "description": description,
+            "content_hash": content_hash(name, description),
+            "source_url": source_url,
+        })
+    return styles
+
+
+class _Source:
+    def __init__(self, url: str):
+        self.url = url
+        self.etag: Optional[str] = None
+        self.last_modified: Optional[str] = None
+        self.styles: List[dict] = []
+        self.fetched_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+
+class StyleScraper:
+    """Scrapes trending styles from several pages into one table.
+
+    Pages are fetched concurrently with If-None-Match / If-Modified-Since, so
+    unchanged pages are not re-parsed. Styles are deduplicated by a hash of
+    their name and description and written with a single upsert on
+    `content_hash` (see sql/trending_styles_content_hash.sql). `start()` runs
+    the scrape every `interval` seconds.
+    """
+
+    def __init__(self, supabase, urls: List[str], table: str = "trending_styles", interval: float = 3600,
+                 concurrency: int = 4, timeout: float = 15, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.supabase = supabase
+        self.table = table
+        self.interval = interval
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.transport = transport  # e.g. httpx.MockTransport serving local HTML fixtures
+        self.runs = 0
+        self.upserted = 0
+        self.last_run_ms = 0.0
+        self._sources: Dict[str, _Source] = {url: _Source(url) for url in urls}
+        self._written_hashes = set()
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    async def _fetch(self, client: httpx.AsyncClient, source: _Source, slots: asyncio.Semaphore) -> str:
+        headers = {}
+        if source.etag:
+            headers["If-None-Match"] = source.etag
+        if source.last_modified:
+            headers["If-Modified-Since"] = source.last_modified
+        async with slots:
+            try:
+                response = await client.get(source.url, headers=headers)
+                if response.status_code == 304:
+                    return "not_modified"
+                response.raise_for_status()
+                styles = await asyncio.to_thread(parse_styles, response.content, source.url)
+            except Exception as e:
+                source.last_error = str(e)
+                logger.warning("Fetching styles from %s failed: %s", source.url, e)
+                return "failed"
+        source.etag = response.headers.get("ETag")
+        source.last_modified = response.headers.get("Last-Modified")
+        source.styles = styles
+        source.fetched_at = time.time()
+        source.last_error = None
+        return "changed"
+
+    async def run(self) -> dict:
+        """Scrape every source once and upsert styles not written before."""
+        async with self._lock:
+            start = time.perf_counter()
+            slots = asyncio.Semaphore(self.concurrency)
+            async with httpx.AsyncClient(timeout=self.timeout, follow_redirects=True,
+                                         transport=self.transport) as client:
+                results = await asyncio.gather(
+                    *(self._fetch(client, source, slots) for source in self._sources.values())
+                )
+
+            styles = {}
+            for source in self._sources.values():
+                for style in source.styles:
+                    styles.setdefault(style["content_hash"], style)
+            new_rows = [style for key, style in styles.items() if key not in self._written_hashes]
+            if new_rows:
+                await db.execute(
+                    self.supabase.table(self.table).upsert(new_rows, on_conflict="content_hash",
+                                                           ignore_duplicates=True)
+                )
+                self._written_hashes.update(row["content_hash"] for row in new_rows)
+                self.upserted += len(new_rows)
+
+            self.runs += 1
+            self.last_run_ms = (time.perf_counter() - start) * 1000
+            return {
+                "changed": results.count("changed"),
+                "not_modified": results.count("not_modified"),
+                "failed": results.count("failed"),
+                "upserted": len(new_rows),
+                "styles": list(styles.values()),
+            }
+
+    async def start(self):
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self._schedule())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _schedule(self):
+        while True:
+            try:
+                await self.run()
+            except Exception as e:
+                logger.warning("Scheduled style scrape failed: %s", e)
+            await asyncio.sleep(self.interval)
+
+    def status(self) -> dict:
+        return {
+            "runs": self.runs,
+            "upserted": self.upserted,
+            "last_run_ms": round(self.last_run_ms, 2),
+            "interval_seconds": self.interval,
+            "sources": {
+                url: {
+                    "styles": len(source.styles),
+                    "etag": source.etag,
+                    "last_modified": source.last_modified,
+                    "fetched_at": source.fetched_at,
+                    "last_error": source.last_error,
+                }
+                for url, source in self._sources.items()
+            },
+        }
@@ -1,47 +1,21 @@
 import streamlit as st
 import requests
 from pydantic import BaseModel
-from qdrant_client import QdrantClient
-from langchain.chains import RetrievalQA
-from langchain_community.vectorstores import Qdrant
-from langchain_community.embeddings import HuggingFaceEmbeddings
-from langchain_community.llms import GooglePalm  # Import from langchain-community
 from dotenv import load_dotenv
 import os
 
 # Load environment variables
 load_dotenv()
 
-# Initialize Qdrant client
-QDRANT_API_URL = os.getenv("QDRANT_API_URL")
-QDRANT_API_KEY = os.getenv("QDRANT_API_KEY")
 FASTAPI_URL = os.getenv("FASTAPI_URL")
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-QDRANT_PORT=6333
 
-qdrant_client = QdrantClient(
-    url=QDRANT_API_URL,  # Use only the url parameter
-    api_key=QDRANT_API_KEY,
-)
+QUERY_CACHE_TTL = int(os.getenv("RECIPE_QUERY_CACHE_TTL", "600"))
 
-# Initialize embeddings (e.g., Hugging Face)
-embeddings = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
-
-# Initialize Qdrant as a LangChain vector store
-collection_name = "recipes"
-vector_store = Qdrant(
-    client=qdrant_client,
-    collection_name=collection_name,
-    embeddings=embeddings,
-)
-
-# Initialize LangChain RetrievalQA chain
-llm = GooglePalm(google_api_key=GEMINI_API_KEY)  # Replace with Gemini when supported
-qa_chain = RetrievalQA.from_chain_type(
-    llm=llm,
-    chain_type="stuff",
-    retriever=vector_store.as_retriever(),
-)
+# Built once per server process and shared across reruns and sessions
+@st.cache_resource
+def get_http_session():
+    """Keep-alive session for calls to the FastAPI backend."""
+    return requests.Session()
 
 class Recipe(BaseModel):
     name: str
@@ -54,14 +28,16 @@ class Query(BaseModel):
 
 # Function to add a recipe
 def add_recipe(recipe: Recipe):
-    response = requests.post(f"{FASTAPI_URL}/add-recipe/", json=recipe.dict())
+    response = get_http_session().post(f"{FASTAPI_URL}/add-recipe/", json=recipe.dict())
     if response.status_code != 200:
         raise Exception(f"Failed to add recipe: {response.text}")
+    query_recipes.clear()  # Answers may change with the new recipe
     return response.json()
 
-# Function to query recipes
-def query_recipes(query: Query):
-    response = requests.post(f"{FASTAPI_URL}/query-recipes/", json=query.dict())
+# Function to query recipes; repeated questions are answered from the cache for QUERY_CACHE_TTL seconds
+@st.cache_data(ttl=QUERY_CACHE_TTL, show_spinner=False)
+def query_recipes(query_text: str):
+    response = get_http_session().post(f"{FASTAPI_URL}/query-recipes/", json=Query(query=query_text).dict())
     if response.status_code != 200:
         raise Exception(f"Failed to query recipes: {response.text}")
     return response.json()
@@ -90,10 +66,12 @@ with st.expander("Add a New Recipe"):
 
 # Input for querying recipes
 query_input = st.text_input("Ask about recipes:")
-if st.button("Query"):
+col_query, col_refresh = st.columns([1, 1])
+if col_refresh.button("Clear cached answers"):
+    query_recipes.clear()
+if col_query.button("Query"):
     if query_input:
-        query = Query(query=query_input)
-        result = query_recipes(query)
+        result = query_recipes(query_input.strip())
         st.write(result["response"])
     else:
         st.error("Please enter a query.")
@@ -0,0 +1,146 @@
+import asyncio
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+class VideoJob(BaseModel):
+    job_id: str
+    record_id: str
+    prompt: str
+    status: str = "queued"  # queued -> running -> succeeded | failed
+    videos: List[dict] = []
+    error: Optional[str] = None
+    created_at: str
+    updated_at: str
+
+
+class VideoJobQueue:
+    """Runs Veo long-running operations on a pool of background workers.
+
+    `client` only needs `models.generate_videos(...)` and `operations.get(op)`,
+    so a local fake can stand in for the genai client. Finished videos are
+    written to `store` and jobs only keep their download URLs.
+    """
+
+    def __init__(self, client, model: str, store, config=None, workers: int = 2,
+                 poll_interval: float = 5.0, max_poll_interval: float = 60.0,
+                 backoff: float = 2.0, timeout: float = 900.0, max_jobs: int = 1000):
+        self.client = client
+        self.model = model
+        self.store = store
+        self.config = config
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.backoff = backoff
+        self.timeout = timeout
+        self.max_jobs = max_jobs
+        self._jobs: "OrderedDict[str, VideoJob]" = OrderedDict()
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+    def _start_workers(self):
+        # Workers are created lazily so they bind to the running event loop
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def submit(self, prompt: str, record_id: str) -> VideoJob:
+        """Queue a generation and return the job without waiting for it."""
+        self._start_workers()
+        now = datetime.now().isoformat()
+        job = VideoJob(
+            job_id=str(uuid.uuid4()),
+            record_id=record_id,
+            prompt=prompt,
+            created_at=now,
+            updated_at=now,
+        )
+        self._jobs[job.job_id] = job
+        self._prune()
+        await self._queue.put(job.job_id)
+        return job
+
+    def get(self, job_id: str) -> Optional[VideoJob]:
+        return self._jobs.get(job_id)
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def _prune(self):
+        # Forget the oldest finished jobs once we hold more than max_jobs
+        excess = len(self._jobs) - self.max_jobs
+        if excess <= 0:
+            return
+        for job_id in [j.job_id for j in self._jobs.values() if j.status in ("succeeded", "failed")][:excess]:
+            del self._jobs[job_id]
+
+    def _update(self, job: VideoJob, **fields):
+        for name, value in fields.items():
+            setattr(job, name, value)
+        job.updated_at = datetime.now().isoformat()
+
+    async def _worker(self):
+        while True:
+            job_id = await self._queue.get()
+            job = self._jobs.get(job_id)
+            try:
+                if job is not None:
+                    await self._run(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._update(job, status="failed", error=str(e))
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: VideoJob):
+        self._update(job, status="running")
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.timeout
+
+        # The SDK calls are blocking HTTP requests, so keep them off the event loop
+        operation = await asyncio.to_thread(
+            self.client.models.generate_videos,
+            model=self.model,
+            prompt=job.prompt,
+            config=self.config,
+        )
+
+        # Poll with exponential backoff instead of a fixed sleep
+        delay = self.poll_interval
+        while not operation.done:
+            if loop.time() + delay > deadline:
+                raise TimeoutError(f"Video generation did not finish within {self.timeout:.0f}s")
+            await asyncio.sleep(delay)
+            delay = min(delay * self.backoff, self.max_poll_interval)
+            operation = await asyncio.to_thread(self.client.operations.get, operation)
+
+        if getattr(operation, "error", None) or not operation.response:
+            raise RuntimeError(f"Operation did not complete successfully: {getattr(operation, 'error', None)}")
+
+        videos = await self._collect(job, operation.response)
+        self._update(job, status="succeeded", videos=videos)
+
+    async def _collect(self, job: VideoJob, response) -> List[dict]:
+        videos = []
+        for idx, generated_video in enumerate(response.generated_videos):
+            video_bytes = generated_video.video.video_bytes
+            key = await asyncio.to_thread(self.store.put, video_bytes)
+            videos.append({
+                "filename": f"{job.record_id}_{idx}.mp4",
+                "sha256": key,
+                "size": len(video_bytes),
+                "url": self.store.url(key),
+            })
+            # Drop the SDK's copy so finished jobs don't pin whole MP4s in memory
+            generated_video.video.video_bytes = None
+        return videos
@@ -0,0 +1,137 @@
+import hashlib
+import os
+import re
+import tempfile
+from typing import Optional
+
+from fastapi import HTTPException
+from fastapi.responses import RedirectResponse, StreamingResponse
+
+CHUNK_SIZE = 1024 * 1024
+_KEY_RE = re.compile(r"^[0-9a-f]{64}$")
+
+
+def content_key(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class LocalVideoStore:
+    """Content-addressed video store on the local filesystem."""
+
+    def __init__(self, root: str, base_url: str = "/videos"):
+        self.root = root
+        self.base_url = base_url.rstrip("/")
+
+    def put(self, data: bytes) -> str:
+        key = content_key(data)
+        path = self._path(key)
+        if os.path.exists(path):  # Same bytes already stored
+            return key
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temp file first so readers never see a partial video
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+        return key
+
+    def path(self, key: str) -> Optional[str]:
+        if not _KEY_RE.match(key):
+            return None
+        path = self._path(key)
+        return path if os.path.exists(path) else None
+
+    def url(self, key: str) -> str:
+        return f"{self.base_url}/{key}"
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], f"{key}.mp4")
+
+
+class SupabaseVideoStore:
+    """Content-addressed video store backed by a Supabase storage bucket."""
+
+    def __init__(self, supabase, bucket: str = "videos"):
+        self.supabase = supabase
+        self.bucket = bucket
+
+    def put(self, data: bytes) -> str:
+        key = content_key(data)
+        self.supabase.storage.from_(self.bucket).upload(
+            f"{key}.mp4", data, {"content-type": "video/mp4", "upsert": "true"}
+        )
+        return key
+
+    def path(self, key: str) -> Optional[str]:
+        return None
+
+    def url(self, key: str) -> str:
+        return self.supabase.storage.from_(self.bucket).get_public_url(f"{key}.mp4")
+
+
+def create_video_store(supabase=None):
+    """Pick the storage backend from VIDEO_STORAGE_BACKEND (local or supabase)."""
+    if os.getenv("VIDEO_STORAGE_BACKEND", "local") == "supabase":
+        return SupabaseVideoStore(supabase, os.getenv("VIDEO_STORAGE_BUCKET", "videos"))
+    return LocalVideoStore(os.getenv("VIDEO_STORAGE_DIR", "videos"))
+
+
+def _parse_range(range_header: str, size: int):
+    """(start, end) for a single byte range, or None to ignore the header and send the whole file.
+
+    Malformed or unsupported ranges are ignored; a well-formed range past
+    the end of the file is answered with 416.
+    """
+    match = re.match(r"bytes=(\d*)-(\d*)$", range_header.strip())
+    if not match or match.groups() == ("", ""):
+        return None
+    start, end = match.groups()
+    if start and end and int(end) < int(start):
+        return None
+    if start == "":  # Suffix range: last N bytes
+        start, end = max(size - int(end), 0), size - 1
+        unsatisfiable = int(match.group(2)) == 0 or size == 0
+    else:
+        start, end = int(start), min(int(end), size - 1) if end else size - 1
+        unsatisfiable = start >= size
+    if unsatisfiable:
+        raise HTTPException(status_code=416, detail="Requested range not satisfiable",
+                            headers={"Content-Range": f"bytes */{size}"})
+    return start, end
+
+
+def _iter_file(path: str, start: int, length: int):
+    with open(path, "rb") as f:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def video_response(store, key: str, range_header: Optional[str] = None):
+    """Stream a stored video in chunks, honouring a single HTTP Range."""
+    path = store.path(key)
+    if path is None:
+        if isinstance(store, SupabaseVideoStore) and _KEY_RE.match(key):
+            return RedirectResponse(store.url(key))
+        raise HTTPException(status_code=404, detail=f"Video {key} not found.")
+
+    size = os.path.getsize(path)
+    headers = {"Accept-Ranges": "bytes", "ETag": f'"{key}"'}
+    byte_range = _parse_range(range_header, size) if range_header else None
+    if byte_range:
+        start, end = byte_range
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        headers["Content-Length"] = str(end - start + 1)
+        return StreamingResponse(_iter_file(path, start, end - start + 1), status_code=206,
+                                 media_type="video/mp4", headers=headers)
+
+    headers["Content-Length"] = str(size)
+    return StreamingResponse(_iter_file(path, 0, size), media_type="video/mp4", headers=headers)
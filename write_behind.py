@@ -0,0 +1,112 @@
+import asyncio
+import logging
+import time
+from typing import List, Optional
+
+import db
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindBuffer:
+    """Collects rows for one table and writes them with bulk inserts off the request path.
+
+    A batch is flushed when it reaches `flush_size` rows or `flush_interval`
+    seconds after its first row. `submit()` only waits when `max_queue` rows
+    are already pending. Failed inserts are retried with exponential backoff.
+    """
+
+    def __init__(self, supabase, table: str, flush_size: int = 50, flush_interval: float = 2.0,
+                 max_queue: int = 10000, max_retries: int = 3, retry_backoff: float = 0.5):
+        self.supabase = supabase
+        self.table = table
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.flushed_rows = 0
+        self.flushed_batches = 0
+        self.failed_rows = 0
+        self.retries = 0
+        self.last_flush_ms = 0.0
+        self._total_flush_ms = 0.0
+        self._queue: Optional[asyncio.Queue] = None
+        self._pending: List[dict] = []
+        self._inflight: Optional[asyncio.Task] = None  # Flush of the batch taken from _pending
+        self._task: Optional[asyncio.Task] = None
+
+    async def submit(self, row: dict):
+        if self._task is None:
+            # Started lazily so the queue and task bind to the running loop
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+            self._task = asyncio.create_task(self._run())
+        await self._queue.put(row)
+
+    async def close(self):
+        """Stop the background task and flush whatever is still queued."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        if self._inflight is not None:
+            # The flush is shielded from the cancel above; let it finish its retries
+            await asyncio.gather(self._inflight, return_exceptions=True)
+            self._inflight = None
+        rows, self._pending = self._pending, []
+        while not self._queue.empty():
+            rows.append(self._queue.get_nowait())
+        for start in range(0, len(rows), self.flush_size):
+            await self._flush(rows[start:start + self.flush_size])
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            # Rows taken off the queue but not yet flushed; close() picks them up
+            self._pending = [await self._queue.get()]
+            deadline = loop.time() + self.flush_interval
+            while len(self._pending) < self.flush_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    self._pending.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            batch, self._pending = self._pending, []
+            self._inflight = asyncio.create_task(self._flush(batch))
+            await asyncio.shield(self._inflight)
+            self._inflight = None
+
+    async def _flush(self, rows: List[dict]):
+        start = time.perf_counter()
+        for attempt in range(self.max_retries + 1):
+            try:
+                await db.execute(self.supabase.table(self.table).insert(rows))
+                break
+            except Exception as e:
+                if attempt == self.max_retries:
+                    self.failed_rows += len(rows)
+                    logger.error("Dropping %d %s rows after %d attempts: %s",
+                                 len(rows), self.table, attempt + 1, e)
+                    return
+                self.retries += 1
+                await asyncio.sleep(self.retry_backoff * 2 ** attempt)
+        self.last_flush_ms = (time.perf_counter() - start) * 1000
+        self._total_flush_ms += self.last_flush_ms
+        self.flushed_rows += len(rows)
+        self.flushed_batches += 1
+
+    def stats(self) -> dict:
+        return {
+            "table": self.table,
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "max_queue": self.max_queue,
+            "flushed_rows": self.flushed_rows,
+            "flushed_batches": self.flushed_batches,
+            "failed_rows": self.failed_rows,
+            "retries": self.retries,
+            "last_flush_ms": round(self.last_flush_ms, 2),
+            "avg_flush_ms": round(self._total_flush_ms / self.flushed_batches, 2) if self.flushed_batches else 0.0,
+        }